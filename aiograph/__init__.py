@@ -1,8 +1,31 @@
-from . import types
-from . import utils
-from .api import Telegraph
-from .utils import exceptions
+import importlib
 
-__all__ = ['Telegraph', 'types', 'utils', 'exceptions']
+__all__ = ['Telegraph', 'TelegraphPool', 'types', 'utils', 'exceptions']
 
 __version__ = '0.2'
+
+# Public names are imported on first access: aiohttp is not loaded
+# when only a part of the package (like `aiograph.utils.html`) is used
+_LAZY_NAMES = {
+    'Telegraph': ('.api', 'Telegraph'),
+    'TelegraphPool': ('.pool', 'TelegraphPool'),
+    'types': ('.types', None),
+    'utils': ('.utils', None),
+    'exceptions': ('.utils.exceptions', None),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr_name = _LAZY_NAMES[name]
+    value = importlib.import_module(module_name, __name__)
+    if attr_name is not None:
+        value = getattr(value, attr_name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,40 +1,54 @@
 import asyncio
-
+import calendar
+import collections
 import contextlib
+import datetime
+import functools
+import os
 from contextvars import ContextVar
 
-import os
 import secrets
-import ssl
-from pathlib import Path
-from typing import List, Optional, Union
-
-import aiohttp
-import certifi
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Iterable, List, Mapping, Optional, Union
+from urllib.parse import urlencode
 
 from . import types
+from .transport import AiohttpTransport, BaseTransport, TransportResponse, _timeout_kwargs
 from .utils import exceptions, html
+from .utils.batch import BatchResult, DEFAULT_CONCURRENCY, run_batch
+from .utils.cache import LRUCache, ResponseCache, request_key
+from .utils.content import MAX_CONTENT_SIZE, check_content_size, content_size, page_digest, split_content
+from .utils.files import (DEFAULT_CHUNK_SIZE, MAX_FILE_SIZE, PrefixedReader, check_size, get_size, iter_chunks,
+                          prepare_file, sniff_content_type)
+from .utils.json_codec import CustomJsonCodec, JsonCodec, get_json_codec
+from .utils.rate_limit import RateLimiter
+from .utils.retry import RetryPolicy
+from .utils.singleflight import SingleFlight
+from .utils.upload_cache import BaseUploadCache, hash_content_async, new_hasher
+from .utils.views import bucket_end, iter_buckets
+
+if TYPE_CHECKING:
+    import ssl
+
+    import aiohttp
 
 __all__ = ['Telegraph', 'Methods', 'SERVICE_URL']
 
 SERVICE_URL = 'telegra.ph'
+PAGE_LIST_MAX_LIMIT = 200
+AUTHOR_CACHE_TTL = 300
+AUTHOR_CACHE_SIZE = 1024
+VIEWS_HISTORY_SIZE = 65536
+KEEPALIVE_TIMEOUT = 15
+DNS_CACHE_TTL = 10
+PAGE_DIGESTS_SIZE = 65536
+# Bytes kept free in each part of the page chain for the navigation link
+CHAIN_LINK_RESERVE = 512
 _PAYLOAD_EXCLUDE_LIST = ['self', 'cls']
+_FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
 
 
 # TODO: Allow to change default auth mode.
 
-def _guess_filename(obj):
-    """
-    Get file name from object
-
-    :param obj:
-    :return:
-    """
-    name = getattr(obj, 'name', None)
-    if name and isinstance(name, str) and name[0] != '<' and name[-1] != '>':
-        return os.path.basename(name)
-
-
 def _generate_payload(exclude=None, **kwargs):
     """
     Generate payload
@@ -53,6 +67,36 @@ def _generate_payload(exclude=None, **kwargs):
             and not key.startswith('_')}
 
 
+def _encode_form(payload: Optional[dict]) -> bytes:
+    """
+    Encode payload as form body
+
+    Values serialized to bytes (by orjson) are quoted as is, without decoding.
+
+    :param payload:
+    :return: bytes
+    """
+    if not payload:
+        return b''
+    return urlencode(payload).encode('ascii')
+
+
+@functools.lru_cache(maxsize=None)
+def get_ssl_context() -> 'ssl.SSLContext':
+    """
+    Get SSL context with CA certificates from certifi
+
+    Loading of certificates is slow so the context is created once and shared by all clients.
+
+    :return: SSLContext
+    """
+    import ssl
+
+    import certifi
+
+    return ssl.create_default_context(cafile=certifi.where())
+
+
 class Methods:
     """
     List of API methods
@@ -76,27 +120,51 @@ class Telegraph:
                  token: Optional[str] = None,
                  service_url: str = SERVICE_URL,
                  connections_limit: Optional[int] = None,
-                 proxy: Optional[str] = None, proxy_auth: Optional[aiohttp.BasicAuth] = None,
+                 proxy: Optional[str] = None, proxy_auth: Optional['aiohttp.BasicAuth'] = None,
                  loop: asyncio.AbstractEventLoop = None,
-                 json_serialize: callable = None, json_deserialize: callable = None):
-        # Asyncio loop instance
-        if loop is None:
-            loop = asyncio.get_event_loop()
+                 json_serialize: callable = None, json_deserialize: callable = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 author_cache_ttl: Optional[float] = AUTHOR_CACHE_TTL,
+                 coalesce_requests: bool = False,
+                 upload_cache: Optional[BaseUploadCache] = None,
+                 html_parser: Union[str, html.ParserBackend, None] = None,
+                 max_content_size: Optional[int] = MAX_CONTENT_SIZE,
+                 json_codec: Union[str, JsonCodec, None] = None,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: Optional[float] = KEEPALIVE_TIMEOUT,
+                 ttl_dns_cache: Optional[int] = DNS_CACHE_TTL,
+                 timeout: Union[float, 'aiohttp.ClientTimeout', None] = None,
+                 connector: Optional['aiohttp.BaseConnector'] = None,
+                 session: Optional['aiohttp.ClientSession'] = None,
+                 transport: Optional[BaseTransport] = None):
+        """
+        Connection settings:
+
+        :param connections_limit: max count of simultaneous connections
+        :param limit_per_host: max count of simultaneous connections to one host (0 - no limit)
+        :param keepalive_timeout: time to keep idle connections open (None - don't close)
+        :param ttl_dns_cache: time to cache resolved addresses (None - forever)
+        :param timeout: total timeout of requests in seconds or ClientTimeout with connect/read/total timeouts
+        :param connector: pre-built connector shared with other clients (isn't closed by the client)
+        :param session: pre-built session shared with other clients (isn't closed by the client)
+        :param transport: transport of API requests and uploads (by default requests are sent
+            through the session, see :mod:`aiograph.testing` for in-process fake server)
+
+        :param upload_cache: storage of paths of uploaded files by hash of content, it can be shared
+            with other clients, so it isn't closed by the client (call its `close()` method)
+        """
+        # Asyncio loop instance (by default is used the running loop)
         self.loop = loop
 
         # JSON
-        if not json_serialize or not json_deserialize:
-            try:
-                import ujson as json
-            except ImportError:
-                import json
-
-            if json_serialize is None:
-                json_serialize = json.dumps
-            if json_deserialize is None:
-                json_deserialize = json.loads
-        self._json_serialize = json_serialize
-        self._json_deserialize = json_deserialize
+        if json_serialize or json_deserialize:
+            default = get_json_codec(json_codec)
+            json_codec = CustomJsonCodec(json_serialize or default.dumps_str, json_deserialize or default.loads)
+        self.json_codec = get_json_codec(json_codec)
+        self._json_serialize = self.json_codec.dumps
+        self._json_deserialize = self.json_codec.loads
 
         # URL's
         self._service = None
@@ -107,14 +175,73 @@ class Telegraph:
         # Proxy settings
         self.proxy = proxy
         self.proxy_auth = proxy_auth
+        self._socks_proxy = None
+        if isinstance(proxy, str) and (proxy.startswith('socks5://') or proxy.startswith('socks4://')):
+            if session is not None or connector is not None:
+                raise ValueError('SOCKS proxy can\'t be used with custom connector or session')
+            self._socks_proxy = (proxy, proxy_auth)
+            self.proxy = None
+            self.proxy_auth = None
 
-        # aiohttp main session
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        # aiohttp main session (created on first request)
+        if session is not None and connector is not None:
+            raise ValueError('connector and session can\'t be passed together')
+        self._owns_session = session is None
+        self._session = session
+        self._session_pid = os.getpid()
+        self._connector = connector
+        self._connector_options = dict(limit=connections_limit, limit_per_host=limit_per_host,
+                                       keepalive_timeout=keepalive_timeout, ttl_dns_cache=ttl_dns_cache)
+        self._timeout = timeout
+
+        # Requests to the API and uploads
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = AiohttpTransport(lambda: self.session, lambda: (self.proxy, self.proxy_auth))
+        self.transport = transport
 
-        if isinstance(proxy, str) and (proxy.startswith('socks5://') or proxy.startswith('socks4://')):
+        self._token = token
+
+        # Retries
+        self.retry_policy = retry_policy
+
+        # Client-side rate limit per access token
+        self.rate_limiter = rate_limiter
+
+        # Cache of read-only methods responses
+        self.response_cache = response_cache
+
+        # Identical concurrent read requests share one HTTP request
+        self.single_flight = SingleFlight() if coalesce_requests else None
+
+        # Author name and URL used by `as_user` mode, by access token
+        self._author_cache = LRUCache(maxsize=AUTHOR_CACHE_SIZE, ttl=author_cache_ttl)
+
+        # Backend used for converting HTML content
+        self.html_parser = html.get_parser_backend(html_parser)
+
+        # Size of content is checked before sending (None - leave it to the server)
+        self.max_content_size = max_content_size
+
+        # Paths of uploaded files by hash of content (owned by the caller)
+        self.upload_cache = upload_cache
+
+        # Views of completed periods (can't be changed anymore)
+        self._views_history = LRUCache(maxsize=VIEWS_HISTORY_SIZE)
+
+        # Hashes of pages state written or seen by `sync_page`, by path
+        self._page_digests = LRUCache(maxsize=PAGE_DIGESTS_SIZE)
+        self.skipped_writes = 0
+
+    def _create_connector(self) -> 'aiohttp.BaseConnector':
+        import aiohttp
+
+        ssl_context = get_ssl_context()
+        if self._socks_proxy is not None:
             from aiohttp_socks import SocksConnector
             from aiohttp_socks.utils import parse_proxy_url
 
+            proxy, proxy_auth = self._socks_proxy
             socks_ver, host, port, username, password = parse_proxy_url(proxy)
             if proxy_auth:
                 if not username:
@@ -122,20 +249,36 @@ class Telegraph:
                 if not password:
                     password = proxy_auth.password
 
-            connector = SocksConnector(socks_ver=socks_ver, host=host, port=port,
-                                       username=username, password=password,
-                                       limit=connections_limit, ssl_context=ssl_context,
-                                       rdns=True, loop=self.loop)
+            return SocksConnector(socks_ver=socks_ver, host=host, port=port,
+                                  username=username, password=password,
+                                  ssl_context=ssl_context, rdns=True, loop=self.loop,
+                                  **self._connector_options)
 
-            self.proxy = None
-            self.proxy_auth = None
-        else:
-            connector = aiohttp.TCPConnector(limit=connections_limit, ssl=ssl_context,
-                                             loop=self.loop)
+        return aiohttp.TCPConnector(ssl=ssl_context, loop=self.loop, **self._connector_options)
 
-        self.session = aiohttp.ClientSession(connector=connector, loop=self.loop, json_serialize=json_serialize)
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """
+        Get aiohttp session
 
-        self._token = token
+        Own session is created on first access and is created again in the process
+        forked after that (connections of the parent process can't be reused).
+
+        :return: ClientSession
+        """
+        if self._owns_session and self._session_pid != os.getpid():
+            # Don't close connections of the parent process, just forget them
+            self._session = None
+            self._session_pid = os.getpid()
+        if self._session is None or (self._owns_session and self._session.closed):
+            connector_owner = self._connector is None
+            connector = self._create_connector() if connector_owner else self._connector
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(connector=connector, connector_owner=connector_owner,
+                                                  loop=self.loop, json_serialize=self.json_codec.dumps_str,
+                                                  **_timeout_kwargs(self._timeout))
+        return self._session
 
     @property
     def service(self) -> str:
@@ -169,58 +312,228 @@ class Telegraph:
     def format_service_url(self, path):
         return self._service_url + path
 
-    async def upload(self, *files, full=True) -> List[str]:
+    async def upload(self, *files,
+                     full: bool = True,
+                     stream: bool = False,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     progress: Optional[Callable[[Optional[str], int, Optional[int]], None]] = None,
+                     max_size: Optional[int] = MAX_FILE_SIZE) -> List[str]:
+        """
+        Upload files to Telegra.ph
+
+        File can be a path, a file-like object, a tuple of filename and file object
+        or a tuple of filename, file object and content type.
+
+        In streaming mode files are read by chunks while the request is sent,
+        so besides of regular files it accepts bytes-like objects, memory-mapped files
+        and asynchronous readers (objects with `read(size)` coroutine method).
+
+        Files with known size exceeding `max_size` are rejected before sending the request.
+
+        :param files: files to be uploaded
+        :param full: return full URL's instead of paths
+        :param stream: read files by chunks
+        :param chunk_size: size of chunk in streaming mode
+        :param progress: callback receiving filename, count of sent bytes and total size of file
+            (None if unknown), is called in streaming mode only
+        :param max_size: max size of file in bytes (None - unlimited)
+        :return: list of URL's or paths of uploaded files
+        """
+        result = await self._upload_files(files, stream=stream, chunk_size=chunk_size,
+                                          progress=progress, max_size=max_size)
+
+        if full:
+            return [self.format_service_url(item['src']) for item in result if 'src' in item]
+        return [item['src'] for item in result if 'src' in item]
+
+    async def upload_many(self, *files,
+                          per_request: int = 1,
+                          concurrency: int = 4,
+                          full: bool = True,
+                          stream: bool = False,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          progress: Optional[Callable[[Optional[str], int, Optional[int]], None]] = None,
+                          max_size: Optional[int] = MAX_FILE_SIZE) -> List[BatchResult]:
+        """
+        Upload files by several concurrent requests.
+
+        Files are split into groups of `per_request` files, each group is uploaded by a separate request.
+        Failure of one group doesn't affect other groups.
+
+        :param files: files to be uploaded (see :meth:`upload`)
+        :param per_request: count of files in one request
+        :param concurrency: max count of requests in flight
+        :param full: return full URL's instead of paths
+        :param stream: read files by chunks
+        :param chunk_size: size of chunk in streaming mode
+        :param progress: callback receiving filename, count of sent bytes and total size of file
+        :param max_size: max size of file in bytes (None - unlimited)
+        :return: list of :class:`BatchResult` (URL or path of file or error) in the order of files
+        """
+        if per_request < 1:
+            raise ValueError('per_request must be greater than 0')
+
+        groups = [files[offset:offset + per_request] for offset in range(0, len(files), per_request)]
+        results = [None] * len(files)
+
+        async def upload_group(*group):
+            return await self._upload_files(group, stream=stream, chunk_size=chunk_size,
+                                            progress=progress, max_size=max_size)
+
+        async for item in run_batch(upload_group, groups, concurrency=concurrency):
+            offset = item.index * per_request
+            for index, file in enumerate(item.spec, start=offset):
+                result = BatchResult(index=index, spec=file)
+                if not item.ok:
+                    result.error = item.error
+                elif index - offset >= len(item.result) or 'src' not in item.result[index - offset]:
+                    result.error = exceptions.NoFilesPassed()
+                else:
+                    src = item.result[index - offset]['src']
+                    result.result = self.format_service_url(src) if full else src
+                results[index] = result
+
+        return results
+
+    async def _upload_files(self, files, stream, chunk_size, progress, max_size) -> List[dict]:
+        import aiohttp
+
         to_be_closed = []
         form = aiohttp.FormData(quote_fields=False)
+        # Items of files found in the upload cache, by position of file
+        result = [None] * len(files)
+        # Hashes (or hash objects filled while uploading) of files to be saved in the upload cache
+        digests = {}
         try:
-            for file in files:
-                if isinstance(file, tuple):
-                    if len(file) == 2:
-                        filename, fileobj = file
-                        content_type = None
-                    elif len(file) == 3:
-                        filename, fileobj, content_type = file
-                    else:
-                        raise ValueError('Tuple must have exactly 2 or 3 elements: filename, fileobj, content_type')
-                elif isinstance(file, (str, Path)):
-                    fileobj = open(file, 'rb')
+            for index, file in enumerate(files):
+                filename, fileobj, content_type, close = prepare_file(file)
+                if close:
                     to_be_closed.append(fileobj)
-                    filename = os.path.basename(file)
-                    content_type = None
-                else:
-                    fileobj = file
-                    filename = _guess_filename(file)
-                    content_type = None
-
+                check_size(get_size(fileobj), max_size, filename)
+
+                hasher = None
+                if self.upload_cache is not None:
+                    digest = await hash_content_async(fileobj, chunk_size=chunk_size)
+                    if digest is not None:
+                        src = await self.upload_cache.get(digest)
+                        if src is not None:
+                            result[index] = {'src': src}
+                            continue
+                        digests[index] = digest
+                    elif stream:
+                        hasher = digests[index] = new_hasher()
+
+                if stream:
+                    fileobj = iter_chunks(fileobj, chunk_size=chunk_size, max_size=max_size,
+                                          progress=progress, filename=filename, hasher=hasher)
                 form.add_field(secrets.token_urlsafe(8), fileobj, filename=filename, content_type=content_type)
 
-            async with self.session.post(self.format_service_url('/upload'), data=form) as response:
-                result = await response.json(loads=self._json_deserialize)
+            if files and None not in result:
+                return result
+
+            response = await self._post_upload(form)
+            uploaded = self._json_deserialize(response.body)
         finally:
             for item in to_be_closed:
                 item.close()
 
-        if isinstance(result, dict) and 'error' in result:
+        if isinstance(uploaded, dict) and 'error' in uploaded:
             raise exceptions.NoFilesPassed()
 
-        if full:
-            return [self.format_service_url(item['src']) for item in result if 'src' in item]
-        return [item['src'] for item in result if 'src' in item]
+        uploaded = iter(uploaded)
+        for index, item in enumerate(result):
+            if item is not None:
+                continue
+            item = result[index] = next(uploaded, {})
+
+            digest = digests.get(index)
+            if digest is not None and 'src' in item:
+                if not isinstance(digest, str):
+                    digest = digest.hexdigest()
+                await self.upload_cache.set(digest, item['src'])
+
+        return result
+
+    async def _post_upload(self, form: 'aiohttp.FormData',
+                           timeout: Union[float, 'aiohttp.ClientTimeout', None] = None) -> TransportResponse:
+        """
+        Send upload request
+
+        FileTooLarge raised by streamed file while the body is written is wrapped by aiohttp
+        into connection error, so it's unwrapped here.
+
+        :param form: form with files
+        :param timeout: timeout of request (seconds or ClientTimeout)
+        :raise: ServerError if the server responds with 5xx status
+        :return: TransportResponse
+        """
+        import aiohttp
+
+        try:
+            response = await self.transport.post(self.format_service_url('/upload'), data=form, timeout=timeout)
+        except aiohttp.ClientConnectionError as e:
+            cause = e.__cause__
+            while cause is not None:
+                if isinstance(cause, exceptions.FileTooLarge):
+                    raise cause from None
+                cause = cause.__cause__
+            raise
+
+        if response.status >= 500:
+            raise exceptions.ServerError(response.status)
+        return response
+
+    async def upload_from_url(self, url: str,
+                              filename: Optional[str] = None,
+                              content_type: Optional[str] = None,
+                              full: bool = True,
+                              max_size: Optional[int] = MAX_FILE_SIZE,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              source_timeout: Union[float, 'aiohttp.ClientTimeout', None] = None,
+                              upload_timeout: Union[float, 'aiohttp.ClientTimeout', None] = None) -> str:
+        """
+        Upload file from URL to Telegra.ph
+
+        File is relayed by chunks while it's downloaded so it's never fully loaded into memory.
+        Download is aborted as soon as the size of file exceeds `max_size`.
+
+        :param url: URL of the file
+        :param filename: name of file
+        :param content_type: content type of file (detected by the first bytes or by response headers by default)
+        :param full: return full URL instead of path
+        :param max_size: max size of file in bytes (None - unlimited)
+        :param chunk_size: size of chunk
+        :param source_timeout: timeout of downloading (seconds or ClientTimeout)
+        :param upload_timeout: timeout of uploading (seconds or ClientTimeout)
+        :raise: aiohttp.ClientResponseError if the source responds with error status
+        :return: URL or path of uploaded file
+        """
+        import aiohttp
 
-    async def upload_from_url(self, url, filename=None, content_type=None, full=True):
         form = aiohttp.FormData(quote_fields=False)
 
         if filename is None:
             filename = 'file'
 
-        async with self.session.get(url) as response:
+        async with self.session.get(url, **_timeout_kwargs(source_timeout)) as response:
+            # Don't relay error pages of the source
+            response.raise_for_status()
+            check_size(response.content_length, max_size, filename)
+
+            head = await response.content.read(chunk_size)
+            if content_type is None:
+                content_type = sniff_content_type(head)
+            if content_type is None and response.content_type != 'application/octet-stream':
+                content_type = response.content_type
+
             form.add_field(secrets.token_urlsafe(8),
-                           response.content,
+                           iter_chunks(PrefixedReader(head, response.content), chunk_size=chunk_size,
+                                       max_size=max_size, filename=filename),
                            filename=filename,
                            content_type=content_type)
 
-            async with self.session.post(self.format_service_url('/upload'), data=form) as r:
-                result = await r.json(loads=self._json_deserialize)
+            uploaded = await self._post_upload(form, timeout=upload_timeout)
+            result = self._json_deserialize(uploaded.body)
 
         if isinstance(result, dict) and 'error' in result:
             raise exceptions.NoFilesPassed()
@@ -231,14 +544,88 @@ class Telegraph:
             return self.format_service_url(item)
         return item
 
-    async def request(self, method: str, *, path: Optional[str] = None, payload: Optional[dict] = None):
-        url = self.format_api_url(method, path)
-        async with self.session.post(url, data=payload, proxy=self.proxy, proxy_auth=self.proxy_auth) as response:
-            json_data = await response.json(loads=self._json_deserialize)
+    async def upload_from_urls(self, *urls,
+                               concurrency: int = 4,
+                               full: bool = True,
+                               max_size: Optional[int] = MAX_FILE_SIZE,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE,
+                               source_timeout: Union[float, 'aiohttp.ClientTimeout', None] = None,
+                               upload_timeout: Union[float, 'aiohttp.ClientTimeout', None] = None
+                               ) -> List[BatchResult]:
+        """
+        Upload many files from URL's concurrently (see :meth:`upload_from_url`)
+
+        Each item can be an URL or a tuple of URL, filename and content type.
+
+        :param urls: URL's of files
+        :param concurrency: max count of files in flight
+        :param full: return full URL's instead of paths
+        :param max_size: max size of file in bytes (None - unlimited)
+        :param chunk_size: size of chunk
+        :param source_timeout: timeout of downloading (seconds or ClientTimeout)
+        :param upload_timeout: timeout of uploading (seconds or ClientTimeout)
+        :return: list of :class:`BatchResult` (URL or path of file or error) in the order of URL's
+        """
+        upload = functools.partial(self.upload_from_url, full=full, max_size=max_size, chunk_size=chunk_size,
+                                   source_timeout=source_timeout, upload_timeout=upload_timeout)
+        return [item async for item in run_batch(upload, urls, concurrency=concurrency, ordered=True)]
+
+    async def request(self, method: str, *, path: Optional[str] = None, payload: Optional[dict] = None,
+                      refresh: bool = False):
+        # With `refresh` neither cached response nor concurrent identical request is used,
+        # the fresh response replaces the cached one
+        cache = self.response_cache
+        use_cache = cache is not None and cache.is_cached(method)
+        if use_cache and not refresh:
+            # Responses are stored serialized so cached objects can't be changed by the caller
+            cached = cache.get_response(method, path, payload)
+            if cached is not None:
+                return self._json_deserialize(cached)
+
+        if not refresh and self.single_flight is not None and self.single_flight.is_coalesced(method):
+            result = await self.single_flight.do(request_key(method, path, payload),
+                                                 lambda: self._request(method, path=path, payload=payload),
+                                                 copy=self._copy_result)
+        else:
+            result = await self._request(method, path=path, payload=payload)
+
+        if use_cache:
+            cache.set_response(method, path, payload, self._json_serialize(result))
+        return result
 
-            if not json_data.get('ok') and 'error' in json_data:
-                error_text = json_data['error']
-                raise exceptions.TelegraphError.detect(error_text)
+    def _copy_result(self, result):
+        return self._json_deserialize(self._json_serialize(result))
+
+    def _invalidate_cache(self, *methods: str, path: Optional[str] = None):
+        if self.response_cache is not None:
+            self.response_cache.invalidate(*methods, path=path)
+
+    async def _request(self, method: str, *, path: Optional[str] = None, payload: Optional[dict] = None):
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire((payload or {}).get('access_token') or self.token)
+            try:
+                return await self._send_request(method, path=path, payload=payload)
+            except Exception as e:
+                if self.retry_policy is None:
+                    raise
+                delay = self.retry_policy.get_delay(method, attempt, e)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _send_request(self, method: str, *, path: Optional[str] = None, payload: Optional[dict] = None):
+        url = self.format_api_url(method, path)
+        response = await self.transport.post(url, data=_encode_form(payload), headers=_FORM_HEADERS)
+        if response.status >= 500:
+            raise exceptions.ServerError(response.status)
+        json_data = self._json_deserialize(response.body)
+
+        if not json_data.get('ok') and 'error' in json_data:
+            error_text = json_data['error']
+            raise exceptions.TelegraphError.detect(error_text)
         return json_data['result']
 
     @property
@@ -263,11 +650,25 @@ class Telegraph:
     @contextlib.contextmanager
     def with_token(self, token):
         context_token = self.__context_token.set(token)
-        yield
-        self.__context_token.reset(context_token)
+        try:
+            yield
+        finally:
+            self.__context_token.reset(context_token)
 
     async def close(self):
-        await self.session.close()
+        if self._owns_transport:
+            await self.transport.close()
+        if not self._owns_session:
+            return
+        session, self._session = self._session, None
+        if session is not None and self._session_pid == os.getpid():
+            await session.close()
+
+    async def __aenter__(self) -> 'Telegraph':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     def _mix_payload_token(self, payload: dict) -> dict:
         if self.token:
@@ -276,10 +677,7 @@ class Telegraph:
         return payload
 
     async def _mix_payload_author(self, payload: dict) -> dict:
-        account = await self.get_account_info(
-            types.AccountField.AUTHOR_NAME,
-            types.AccountField.AUTHOR_URL
-        )
+        account = await self.get_author(access_token=payload.get('access_token'))
 
         if account.author_name:
             payload.setdefault('author_name', account.author_name)
@@ -288,18 +686,20 @@ class Telegraph:
 
         return payload
 
-    def _prepare_content(self, content: Union[str, List[Union[str, types.NodeElement]]]) -> str:
+    def _content_to_json(self, content: Union[str, List[Union[str, types.NodeElement]]]) -> List[Union[str, dict]]:
         if content is None:
             raise exceptions.TelegraphError.detect('CONTENT_REQUIRED')
         if isinstance(content, list):
-            content = html.nodes_to_json(content)
+            return html.nodes_to_json(content)
         elif isinstance(content, str):
-            content = html.html_to_json(content)
-        else:
-            raise TypeError(f"Content must be instance of 'str' or 'List[Union[str, NodeElement]]' "
-                            f"but '{type(content)}' found.")
+            return html.html_to_json(content, backend=self.html_parser)
+        raise TypeError(f"Content must be instance of 'str' or 'List[Union[str, NodeElement]]' "
+                        f"but '{type(content)}' found.")
 
-        return self._json_serialize(content)
+    def _prepare_content(self, content: Union[str, List[Union[str, types.NodeElement]]]) -> str:
+        content = self._json_serialize(self._content_to_json(content))
+        check_content_size(content, self.max_content_size)
+        return content
 
     async def create_account(self,
                              short_name: str,
@@ -357,8 +757,11 @@ class Telegraph:
         payload = _generate_payload(**locals())
         self._mix_payload_token(payload)
         raw = await self.request(Methods.EDIT_ACCOUNT_INFO, payload=payload)
+        self._invalidate_cache(Methods.GET_ACCOUNT_INFO)
+        account = types.Account(**raw)
+        self._author_cache.set(payload.get('access_token'), (account.author_name, account.author_url))
 
-        return types.Account(**raw)
+        return account
 
     async def get_account_info(self,
                                *_fields: Union[str, types.AccountField],
@@ -382,8 +785,8 @@ class Telegraph:
             else:
                 fields.add(field)
 
-        if fields:
-            fields = self._json_serialize(list(fields))
+        # Empty set means default fields of the API
+        fields = self._json_serialize(sorted(fields)) if fields else None
 
         payload = _generate_payload(**locals(), exclude=['field'])
         self._mix_payload_token(payload)
@@ -392,6 +795,34 @@ class Telegraph:
 
         return types.Account(**(raw or {}))
 
+    async def get_author(self, access_token: Optional[str] = None, refresh: bool = False) -> types.Account:
+        """
+        Get author name and URL of the account used by `as_user` mode.
+
+        Result is cached per access token and is updated when account info is changed
+        or the token is revoked through this client.
+
+        :param access_token: Access token of the Telegraph account (by default is used current token)
+        :param refresh: Ignore cached values (including cached response) and request fresh account info
+        :return: Account object with `author_name` and `author_url` fields
+        """
+        if access_token is None:
+            access_token = self.token
+
+        author = None if refresh else self._author_cache.get(access_token)
+        if author is None:
+            # Same payload as of `get_account_info('author_name', 'author_url')`
+            payload = _generate_payload(fields=self._json_serialize(['author_name', 'author_url']),
+                                        access_token=access_token)
+            self._mix_payload_token(payload)
+            raw = await self.request(Methods.GET_ACCOUNT_INFO, payload=payload, refresh=refresh)
+            account = types.Account(**(raw or {}))
+            author = (account.author_name, account.author_url)
+            self._author_cache.set(access_token, author)
+
+        author_name, author_url = author
+        return types.Account(author_name=author_name, author_url=author_url)
+
     async def revoke_access_token(self, access_token: Optional[str] = None, auth=True) -> types.Account:
         """
         Use this method to revoke access_token and generate a new one, for example,
@@ -409,7 +840,13 @@ class Telegraph:
         payload = _generate_payload(**locals())
         self._mix_payload_token(payload)
         raw = await self.request(Methods.REVOKE_ACCESS_TOKEN, payload=payload)
+        self._invalidate_cache(Methods.GET_ACCOUNT_INFO)
         account = types.Account(**raw)
+        author = self._author_cache.pop(payload.get('access_token'))
+        if author is not None:
+            self._author_cache.set(account.access_token, author)
+        if self.rate_limiter is not None:
+            self.rate_limiter.move(payload.get('access_token'), account.access_token)
         if auth:
             self.token = account
 
@@ -447,6 +884,7 @@ class Telegraph:
             await self._mix_payload_author(payload)
 
         raw = await self.request(Methods.CREATE_PAGE, payload=payload)
+        self._invalidate_cache(Methods.GET_ACCOUNT_INFO, Methods.GET_PAGE_LIST)
 
         return types.Page(**raw)
 
@@ -484,9 +922,67 @@ class Telegraph:
             await self._mix_payload_author(payload)
 
         raw = await self.request(Methods.EDIT_PAGE, path=path, payload=payload)
+        self._invalidate_cache(Methods.GET_PAGE, path=path)
+        self._page_digests.pop(path)
+        self._invalidate_cache(Methods.GET_PAGE_LIST)
 
         return types.Page(**raw)
 
+    async def sync_page(self,
+                        path: str,
+                        title: str,
+                        content: Union[str, List[Union[str, types.NodeElement]]],
+                        author_name: Optional[str] = None,
+                        author_url: Optional[str] = None,
+                        return_content: Optional[bool] = None,
+                        access_token: Optional[str] = None,
+                        as_user: bool = False,
+                        fetch: bool = True) -> types.Page:
+        """
+        Edit the page only if its title, author or content is changed.
+
+        State of the page is compared by hash with the state written by previous call
+        of this method. When it's unknown the page is fetched (if `fetch` is enabled).
+        Count of skipped writes is available in `skipped_writes` attribute.
+
+        :param path: path to the page
+        :param title: page title
+        :param content: content in any format accepted by :meth:`edit_page`
+        :param author_name: author name
+        :param author_url: author profile link
+        :param return_content: return content in Page object
+        :param access_token: access token of the account
+        :param as_user: set author name and URL from current user
+        :param fetch: fetch the page when its state is unknown
+        :return: Page object (built from the arguments when the write is skipped)
+        """
+        content = self._content_to_json(content)
+        if as_user:
+            author = await self.get_author(access_token=access_token)
+            author_name = author_name or author.author_name
+            author_url = author_url or author.author_url
+
+        digest = page_digest(title, author_name, author_url, self._json_serialize(content))
+        known = self._page_digests.get(path)
+        if known is None and fetch:
+            # Page could be changed outside of this client, so cached response can't be used
+            raw = await self.request(Methods.GET_PAGE, path=path, payload={'return_content': True}, refresh=True)
+            page = types.Page(**raw)
+            known = page_digest(page.title, page.author_name, page.author_url,
+                                self._json_serialize(page.raw_content or []))
+
+        if known == digest:
+            self.skipped_writes += 1
+            self._page_digests.set(path, digest)
+            return types.Page(path=path, url=self.format_service_url('/' + path), title=title,
+                              author_name=author_name, author_url=author_url,
+                              content=content if return_content else [], can_edit=True)
+
+        page = await self.edit_page(path, title, content, author_name=author_name, author_url=author_url,
+                                    return_content=return_content, access_token=access_token)
+        self._page_digests.set(path, digest)
+        return page
+
     async def get_page(self, path: str, return_content: Optional[bool] = None) -> types.Page:
         """
         Use this method to get a Telegraph page.
@@ -525,6 +1021,81 @@ class Telegraph:
 
         return types.PageList(**raw)
 
+    async def iter_pages(self,
+                         offset: int = 0,
+                         limit: Optional[int] = None,
+                         page_size: int = PAGE_LIST_MAX_LIMIT,
+                         prefetch: int = 1,
+                         access_token: Optional[str] = None) -> AsyncIterator[types.Page]:
+        """
+        Iterate over pages belonging to a Telegraph account.
+
+        Pages are requested by windows of `page_size` items via :meth:`get_page_list`,
+        next `prefetch` windows are requested concurrently while the current one is processed.
+
+        Usage:
+
+        .. code-block:: python3
+
+            async for page in telegraph.iter_pages():
+                print(page.url)
+
+        :param offset: Sequential number of the first page to be returned.
+        :param limit: Max count of pages (all pages by default).
+        :param page_size: (Integer, 1-200) Count of pages requested at once.
+        :param prefetch: Count of windows requested in advance.
+        :param access_token: Access token of the Telegraph account.
+        :return: async iterator of Page objects
+        """
+        if not 1 <= page_size <= PAGE_LIST_MAX_LIMIT:
+            raise ValueError(f"page_size must be in range 1-{PAGE_LIST_MAX_LIMIT}")
+        if prefetch < 0:
+            raise ValueError('prefetch must be greater or equal to 0')
+        if limit is not None and limit <= 0:
+            return
+
+        first_size = page_size if limit is None else min(page_size, limit)
+        current = await self.get_page_list(offset=offset, limit=first_size, access_token=access_token)
+
+        end = current.total_count or 0
+        if limit is not None:
+            end = min(end, offset + limit)
+        next_offset = offset + first_size
+        windows = collections.deque()
+
+        def schedule():
+            nonlocal next_offset
+            size = min(page_size, end - next_offset)
+            windows.append(asyncio.ensure_future(
+                self.get_page_list(offset=next_offset, limit=size, access_token=access_token)
+            ))
+            next_offset += size
+
+        try:
+            while True:
+                while len(windows) < prefetch and next_offset < end:
+                    schedule()
+
+                for page in current.pages:
+                    if offset >= end:
+                        return
+                    yield page
+                    offset += 1
+
+                if not current.pages:
+                    return
+                if not windows:
+                    if next_offset >= end:
+                        return
+                    schedule()
+                current = await windows.popleft()
+        finally:
+            for window in windows:
+                window.cancel()
+            if windows:
+                # Retrieve results (and errors) of prefetched windows which aren't needed anymore
+                await asyncio.gather(*windows, return_exceptions=True)
+
     async def get_views(self,
                         path: str,
                         year: Optional[int] = None,
@@ -552,3 +1123,167 @@ class Telegraph:
         raw = await self.request(Methods.GET_VIEWS, payload=payload)
 
         return types.PageViews(**raw).views
+
+    async def get_views_series(self,
+                               *paths: str,
+                               start: Union[datetime.date, datetime.datetime],
+                               end: Union[datetime.date, datetime.datetime],
+                               granularity: str = 'day',
+                               concurrency: int = DEFAULT_CONCURRENCY) -> List[types.ViewsSeries]:
+        """
+        Get time series of views for one or many Telegraph articles.
+
+        One :meth:`get_views` request is sent per page per period (year, month, day or hour)
+        with limited count of requests in flight. Views of completed periods are
+        remembered by the client so only the current period is requested again next time.
+
+        Naive datetime objects are treated as UTC.
+
+        :param paths: Paths to the Telegraph pages.
+        :param start: First period of series.
+        :param end: Last period of series (included).
+        :param granularity: Size of period: year, month, day or hour.
+        :param concurrency: Max count of requests in flight.
+        :return: list of ViewsSeries objects in the order of paths
+        """
+        buckets = list(iter_buckets(start, end, granularity))
+        now = datetime.datetime.utcnow()
+        series = [types.ViewsSeries(path=path, granularity=granularity,
+                                    timestamps=[calendar.timegm(bucket.timetuple()) for bucket, _ in buckets],
+                                    views=[0] * len(buckets))
+                  for path in paths]
+
+        specs = []
+        for series_index, path in enumerate(paths):
+            for bucket_index, (bucket, params) in enumerate(buckets):
+                key = (path, granularity, bucket)
+                views = self._views_history.get(key)
+                if views is not None:
+                    series[series_index].views[bucket_index] = views
+                else:
+                    specs.append((series_index, bucket_index, key, bucket_end(bucket, granularity) <= now,
+                                  dict(path=path, **params)))
+
+        async def fetch(series_index, bucket_index, key, completed, params):
+            views = await self.get_views(**params)
+            series[series_index].views[bucket_index] = views
+            if completed:
+                self._views_history.set(key, views)
+
+        results = run_batch(fetch, specs, concurrency=concurrency)
+        try:
+            async for item in results:
+                item.unwrap()
+        finally:
+            # Cancel other requests when one of them is failed
+            await results.aclose()
+
+        return series
+
+    def create_pages(self,
+                     pages: Union[Iterable[Mapping], AsyncIterable[Mapping]],
+                     concurrency: int = DEFAULT_CONCURRENCY,
+                     ordered: bool = False) -> AsyncIterator[BatchResult]:
+        """
+        Create many pages with limited count of requests in flight.
+
+        Each page spec is a mapping of :meth:`create_page` arguments.
+        Failed items don't abort the batch: the error is returned in :class:`BatchResult.error`.
+
+        Usage:
+
+        .. code-block:: python3
+
+            async for item in telegraph.create_pages(specs, concurrency=20):
+                if item.ok:
+                    print(item.result.url)
+
+        :param pages: iterable or async iterable of page specs
+        :param concurrency: max count of requests in flight
+        :param ordered: yield results in the order of specs instead of completion order
+        :return: async iterator of :class:`BatchResult` with Page objects
+        """
+        return run_batch(self.create_page, pages, concurrency=concurrency, ordered=ordered)
+
+    def edit_pages(self,
+                   pages: Union[Iterable[Mapping], AsyncIterable[Mapping]],
+                   concurrency: int = DEFAULT_CONCURRENCY,
+                   ordered: bool = False) -> AsyncIterator[BatchResult]:
+        """
+        Edit many pages with limited count of requests in flight.
+
+        Each page spec is a mapping of :meth:`edit_page` arguments (`path` is required).
+        Failed items don't abort the batch: the error is returned in :class:`BatchResult.error`.
+
+        :param pages: iterable or async iterable of page specs
+        :param concurrency: max count of requests in flight
+        :param ordered: yield results in the order of specs instead of completion order
+        :return: async iterator of :class:`BatchResult` with Page objects
+        """
+        return run_batch(self.edit_page, pages, concurrency=concurrency, ordered=ordered)
+
+    async def create_page_chain(self,
+                                title: str,
+                                content: Union[str, List[Union[str, types.NodeElement]]],
+                                author_name: Optional[str] = None,
+                                author_url: Optional[str] = None,
+                                return_content: Optional[bool] = None,
+                                access_token: Optional[str] = None,
+                                as_user: bool = False,
+                                next_text: str = 'Next page',
+                                concurrency: int = DEFAULT_CONCURRENCY) -> List[types.Page]:
+        """
+        Create pages from content which doesn't fit into one page.
+
+        Content is split between top-level nodes into parts of allowed size,
+        the pages are created concurrently and then each page except the last one
+        is edited to end with a link to the next page.
+
+        :param title: title of each page
+        :param content: content in any format accepted by :meth:`create_page`
+        :param author_name: author name
+        :param author_url: author profile link
+        :param return_content: return content in Page objects
+        :param access_token: access token of the account
+        :param as_user: set author name and URL from current user
+        :param next_text: text of the link to the next page
+        :param concurrency: max count of requests in flight
+        :raise: ContentTooBig if one of top-level nodes is too big for a page
+        :return: list of Page objects in order of content
+        """
+        serialize = self._json_serialize
+        reserve = CHAIN_LINK_RESERVE + content_size(serialize(next_text))
+        parts = split_content(self._content_to_json(content), serialize,
+                              max_size=self.max_content_size or MAX_CONTENT_SIZE, reserve=reserve)
+
+        options = dict(author_name=author_name, author_url=author_url, access_token=access_token, as_user=as_user)
+        specs = [dict(title=title, content=part, **options) for part in parts]
+        specs[-1]['return_content'] = return_content
+        pages = [item.unwrap() async for item in self.create_pages(specs, concurrency=concurrency, ordered=True)]
+
+        links = []
+        for part, page, next_page in zip(parts, pages, pages[1:]):
+            link = {'tag': 'p', 'children': [{'tag': 'a', 'attrs': {'href': next_page.url}, 'children': [next_text]}]}
+            links.append(dict(path=page.path, title=title, content=part + [link],
+                              return_content=return_content, **options))
+        async for item in self.edit_pages(links, concurrency=concurrency, ordered=True):
+            pages[item.index] = item.unwrap()
+
+        return pages
+
+    def sync_pages(self,
+                   pages: Union[Iterable[Mapping], AsyncIterable[Mapping]],
+                   concurrency: int = DEFAULT_CONCURRENCY,
+                   ordered: bool = False) -> AsyncIterator[BatchResult]:
+        """
+        Synchronize many pages with limited count of requests in flight.
+
+        Each page spec is a mapping of :meth:`sync_page` arguments.
+        Unchanged pages are not written.
+
+        :param pages: iterable or async iterable of page specs
+        :param concurrency: max count of requests in flight
+        :param ordered: yield results in the order of specs instead of completion order
+        :return: async iterator of :class:`BatchResult` with Page objects
+        """
+        return run_batch(self.sync_page, pages, concurrency=concurrency, ordered=ordered)
@@ -0,0 +1,223 @@
+import functools
+import inspect
+import itertools
+from typing import AsyncIterable, AsyncIterator, Dict, Hashable, Iterable, List, Mapping, Optional, Union
+
+from attr import ib, s
+
+from . import types
+from .api import Telegraph
+from .utils.batch import BatchResult, DEFAULT_CONCURRENCY, run_batch
+
+__all__ = ['TelegraphPool', 'AccountStats', 'STRATEGIES']
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LOADED = 'least_loaded'
+STRATEGIES = (ROUND_ROBIN, LEAST_LOADED)
+
+
+@s
+class AccountStats:
+    """
+    Counters of calls made on behalf of the account
+    """
+
+    key: Hashable = ib()
+    token: str = ib(repr=False)
+    in_flight: int = ib(default=0)
+    calls: int = ib(default=0)
+    errors: int = ib(default=0)
+
+
+class AccountClient:
+    """
+    Proxy calling coroutine methods of :class:`Telegraph` with the token of one account
+    """
+
+    def __init__(self, pool: 'TelegraphPool', stats: AccountStats):
+        self._pool = pool
+        self._stats = stats
+
+    @property
+    def key(self) -> Hashable:
+        return self._stats.key
+
+    @property
+    def token(self) -> str:
+        return self._stats.token
+
+    async def revoke_access_token(self) -> types.Account:
+        """
+        Revoke access token of the account and use the new one for next calls
+
+        :return: Account object with new `access_token` and `auth_url` fields
+        """
+        account = await self._pool._call(self._stats, self._pool.telegraph.revoke_access_token,
+                                         access_token=self._stats.token, auth=False)
+        self._stats.token = account.access_token
+        return account
+
+    def __getattr__(self, name):
+        method = getattr(self._pool.telegraph, name)
+        if not inspect.iscoroutinefunction(method):
+            raise AttributeError(f"Only coroutine methods can be called on behalf of the account, "
+                                 f"'{name}' is not supported")
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            return await self._pool._call(self._stats, method, *args, **kwargs)
+
+        return wrapper
+
+
+class TelegraphPool:
+    """
+    Many Telegraph accounts served by one client (one connector, session and SSL context).
+
+    Usage:
+
+    .. code-block:: python3
+
+        pool = TelegraphPool({'news': NEWS_TOKEN, 'blog': BLOG_TOKEN})
+
+        page = await pool.account('news').get_page_list()
+        page = await pool.create_page('Title', '<p>Content</p>')  # balanced between accounts
+
+        await pool.close()
+    """
+
+    def __init__(self,
+                 accounts: Union[Mapping[Hashable, Union[str, types.Account]], Iterable[Union[str, types.Account]]],
+                 strategy: str = ROUND_ROBIN,
+                 telegraph: Optional[Telegraph] = None,
+                 **kwargs):
+        """
+        :param accounts: mapping of account keys to tokens or iterable of tokens (tokens are used as keys)
+        :param strategy: balancing strategy of new pages: 'round_robin' or 'least_loaded'
+        :param telegraph: client used for requests (by default is created with `kwargs`)
+        :param kwargs: arguments of :class:`Telegraph`
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+
+        if telegraph is None:
+            telegraph = Telegraph(**kwargs)
+        self.telegraph = telegraph
+
+        self._accounts: Dict[Hashable, AccountStats] = {}
+        self._cycle = None
+        if isinstance(accounts, Mapping):
+            accounts = accounts.items()
+        else:
+            accounts = ((None, token) for token in accounts)
+        for key, token in accounts:
+            self.add_account(token, key=key)
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __contains__(self, key: Hashable):
+        return key in self._accounts
+
+    @property
+    def keys(self) -> List[Hashable]:
+        return list(self._accounts)
+
+    def add_account(self, token: Union[str, types.Account], key: Optional[Hashable] = None):
+        """
+        Add account to the pool
+
+        :param token: access token or Account object
+        :param key: account key (by default is used the token)
+        """
+        if isinstance(token, types.Account):
+            token = token.access_token
+        if not isinstance(token, str) or not token:
+            raise TypeError('Access token is required!')
+        if key is None:
+            key = token
+
+        self._accounts[key] = AccountStats(key=key, token=token)
+        self._cycle = None
+
+    def remove_account(self, key: Hashable):
+        del self._accounts[key]
+        self._cycle = None
+
+    def account(self, key: Hashable) -> AccountClient:
+        """
+        Get client calling methods on behalf of the account
+
+        :param key: account key
+        :raise: KeyError if the account is not found
+        :return: proxy of :class:`Telegraph` coroutine methods
+        """
+        return AccountClient(self, self._accounts[key])
+
+    def choose(self) -> AccountClient:
+        """
+        Choose account for new page according to the strategy
+
+        :return: proxy of :class:`Telegraph` coroutine methods
+        """
+        if not self._accounts:
+            raise LookupError('Pool has no accounts')
+
+        if self.strategy == LEAST_LOADED:
+            stats = min(self._accounts.values(), key=lambda item: (item.in_flight, item.calls))
+        else:
+            if self._cycle is None:
+                self._cycle = itertools.cycle(list(self._accounts.values()))
+            stats = next(self._cycle)
+        return AccountClient(self, stats)
+
+    async def _call(self, stats: AccountStats, method, *args, **kwargs):
+        stats.in_flight += 1
+        stats.calls += 1
+        try:
+            with self.telegraph.with_token(stats.token):
+                return await method(*args, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    async def create_page(self, *args, **kwargs) -> types.Page:
+        """
+        Create page on behalf of the account chosen by the strategy
+
+        Arguments are the same as of :meth:`Telegraph.create_page`.
+
+        :return: Page object
+        """
+        return await self.choose().create_page(*args, **kwargs)
+
+    def create_pages(self,
+                     pages: Union[Iterable[Mapping], AsyncIterable[Mapping]],
+                     concurrency: int = DEFAULT_CONCURRENCY,
+                     ordered: bool = False) -> AsyncIterator[BatchResult]:
+        """
+        Create many pages balanced between accounts.
+
+        Each page spec is a mapping of :meth:`Telegraph.create_page` arguments.
+
+        :param pages: iterable or async iterable of page specs
+        :param concurrency: max count of requests in flight
+        :param ordered: yield results in the order of specs instead of completion order
+        :return: async iterator of :class:`BatchResult` with Page objects
+        """
+        return run_batch(self.create_page, pages, concurrency=concurrency, ordered=ordered)
+
+    def stats(self) -> Dict[Hashable, Dict[str, int]]:
+        """
+        Get counters of accounts
+
+        :return: dict of account keys and dicts with in-flight calls, calls and errors
+        """
+        return {key: {'in_flight': item.in_flight, 'calls': item.calls, 'errors': item.errors}
+                for key, item in self._accounts.items()}
+
+    async def close(self):
+        await self.telegraph.close()
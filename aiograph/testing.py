@@ -0,0 +1,530 @@
+"""
+In-process fake of Telegra.ph for tests and benchmarks.
+
+Usage:
+
+.. code-block:: python3
+
+    async with FakeTelegraph(latency=0.05) as server:
+        telegraph = server.telegraph()
+        await telegraph.create_account('test')
+        page = await telegraph.create_page('Title', '<p>Content</p>')
+
+The fake server is an aiohttp application served on the loopback interface.
+Requests of :class:`aiograph.Telegraph` are routed to it by :class:`FakeTransport`
+regardless of the service URL, so links returned by the API look like real ones.
+"""
+import asyncio
+import datetime
+import hashlib
+import html
+import json
+import random
+import re
+from collections import Counter, defaultdict, deque
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from .api import Telegraph
+from .transport import BaseTransport, TransportResponse, _timeout_kwargs
+from .utils.content import MAX_CONTENT_SIZE
+from .utils.files import MAX_FILE_SIZE, sniff_content_type
+
+__all__ = ['FakeTelegraph', 'FakeTransport']
+
+ACCOUNT_FIELDS = ('short_name', 'author_name', 'author_url', 'auth_url', 'page_count')
+DEFAULT_ACCOUNT_FIELDS = ('short_name', 'author_name', 'author_url')
+PAGE_LIST_DEFAULT_LIMIT = 50
+PAGE_LIST_MAX_LIMIT = 200
+DESCRIPTION_LENGTH = 150
+
+_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'video/mp4': 'mp4',
+}
+
+
+class _ApiError(Exception):
+    pass
+
+
+def _to_bool(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ('1', 'true')
+
+
+def _iter_text(nodes) -> Iterator[str]:
+    for node in nodes:
+        if isinstance(node, str):
+            yield node
+        elif isinstance(node, dict):
+            yield from _iter_text(node.get('children', ()))
+
+
+class FakeTelegraph:
+    """
+    Fake Telegra.ph server keeping accounts, pages, views and files in memory
+
+    Supported methods: createAccount, editAccountInfo, getAccountInfo, revokeAccessToken,
+    createPage, editPage, getPage, getPageList, getViews and upload of files.
+    Pages can be opened by URL returned by the API (see :meth:`resolve_url`), each opening adds a view.
+    Latency, server errors and flood limits can be injected randomly (reproducible with `seed`)
+    or scripted for the next calls of a method.
+    """
+
+    def __init__(self,
+                 latency: Union[float, Callable[[str], float]] = 0,
+                 error_rate: float = 0,
+                 flood_rate: float = 0,
+                 flood_wait: int = 1,
+                 seed: Optional[int] = None):
+        """
+        :param latency: delay of responses in seconds or function of method name returning the delay
+        :param error_rate: probability of response with HTTP 500 status
+        :param flood_rate: probability of FLOOD_WAIT error
+        :param flood_wait: seconds in FLOOD_WAIT errors caused by `flood_rate`
+        :param seed: seed of random generator (tokens, injected errors)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.flood_wait = flood_wait
+        self._random = random.Random(seed)
+
+        self.accounts: Dict[str, dict] = {}
+        self.pages: Dict[str, dict] = {}
+        self.files: Dict[str, Tuple[bytes, str]] = {}
+        self._owners: Dict[str, str] = {}
+        self._views: Dict[str, Counter] = defaultdict(Counter)
+        self._failures: Dict[Optional[str], deque] = defaultdict(deque)
+
+        # Count of received requests by method name
+        self.calls = Counter()
+
+        self._methods = {
+            'createAccount': self._create_account,
+            'editAccountInfo': self._edit_account_info,
+            'getAccountInfo': self._get_account_info,
+            'revokeAccessToken': self._revoke_access_token,
+            'createPage': self._create_page,
+            'editPage': self._edit_page,
+            'getPage': self._get_page,
+            'getPageList': self._get_page_list,
+            'getViews': self._get_views,
+        }
+        self._server: Optional[TestServer] = None
+        self._client: Optional[TestClient] = None
+
+    # Server
+
+    def make_app(self) -> web.Application:
+        """
+        Create aiohttp application serving the API, uploads, uploaded files and pages
+
+        :return: web.Application
+        """
+        app = web.Application(client_max_size=MAX_FILE_SIZE * 10)
+        app.router.add_get('/', self._handle_index)
+        app.router.add_post('/upload', self._handle_upload)
+        app.router.add_get('/file/{name}', self._handle_file)
+        app.router.add_route('*', '/{method}', self._handle_method)
+        app.router.add_route('*', '/{method}/{path}', self._handle_method)
+        return app
+
+    async def start(self):
+        self._server = TestServer(self.make_app())
+        self._client = TestClient(self._server)
+        await self._client.start_server()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._server = None
+
+    async def __aenter__(self) -> 'FakeTelegraph':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def make_url(self, path: str) -> str:
+        """
+        Get real URL of the resource of running server (for example of uploaded file)
+
+        :param path: path starting with '/'
+        :return: URL
+        """
+        if self._server is None:
+            raise RuntimeError('Server is not started')
+        return str(self._server.make_url(path))
+
+    def resolve_url(self, url: str) -> str:
+        """
+        Get real URL of the link returned by the API (for example URL of the page)
+
+        :param url: URL on the Telegra.ph host
+        :return: URL
+        """
+        return self.make_url(urlsplit(url).path or '/')
+
+    @property
+    def transport(self) -> 'FakeTransport':
+        if self._client is None:
+            raise RuntimeError('Server is not started')
+        return FakeTransport(self._client)
+
+    def telegraph(self, **kwargs) -> Telegraph:
+        """
+        Create client sending requests to this server
+
+        :param kwargs: arguments of :class:`aiograph.Telegraph`
+        :return: Telegraph
+        """
+        return Telegraph(transport=self.transport, **kwargs)
+
+    # Injection of errors
+
+    def fail_next(self, method: Optional[str] = None, status: int = 500, count: int = 1):
+        """
+        Respond to the next calls of the method with HTTP error
+
+        :param method: API method name or 'upload' (None - any method)
+        :param status: HTTP status
+        :param count: count of calls
+        """
+        self._failures[method].extend([(status, None)] * count)
+
+    def error_next(self, method: Optional[str] = None, error: str = 'INTERNAL_ERROR', count: int = 1):
+        """
+        Respond to the next calls of the method with API error
+
+        :param method: API method name (None - any method)
+        :param error: error description
+        :param count: count of calls
+        """
+        self._failures[method].extend([(200, error)] * count)
+
+    def flood_next(self, method: Optional[str] = None, retry_after: int = 1, count: int = 1):
+        """
+        Respond to the next calls of the method with FLOOD_WAIT error
+
+        :param method: API method name (None - any method)
+        :param retry_after: seconds in the error
+        :param count: count of calls
+        """
+        self.error_next(method, f"FLOOD_WAIT_{retry_after}", count=count)
+
+    def add_views(self, path: str, count: int = 1, when: Optional[datetime.datetime] = None):
+        """
+        Add views of the page
+
+        :param path: page path
+        :param count: count of views
+        :param when: time of views (UTC, by default is used current time)
+        """
+        if path not in self.pages:
+            raise KeyError(path)
+        if when is None:
+            when = datetime.datetime.utcnow()
+        self._views[path][when.replace(minute=0, second=0, microsecond=0, tzinfo=None)] += count
+
+    def add_file(self, data: bytes) -> str:
+        """
+        Store the file as if it was uploaded
+
+        :param data: content of the file (JPEG, PNG, GIF or MP4)
+        :return: path of the file (as `src` in response of upload)
+        """
+        content_type = sniff_content_type(data[:16])
+        if content_type is None:
+            raise ValueError('File type invalid')
+        name = f"{hashlib.sha1(data).hexdigest()[:20]}.{_EXTENSIONS[content_type]}"
+        self.files[name] = (data, content_type)
+        return f"/file/{name}"
+
+    async def _before_call(self, method: str) -> Optional[Tuple[int, Optional[str]]]:
+        self.calls[method] += 1
+
+        latency = self.latency(method) if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        for key in (method, None):
+            if self._failures[key]:
+                return self._failures[key].popleft()
+        if self.error_rate and self._random.random() < self.error_rate:
+            return 500, None
+        if self.flood_rate and self._random.random() < self.flood_rate:
+            return 200, f"FLOOD_WAIT_{self.flood_wait}"
+
+    # Handlers
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        if request.method == 'GET' and method not in self._methods and method in self.pages:
+            # Opening of the page in browser is not an API call
+            return self._view_page(method)
+
+        params = dict(request.query)
+        if request.method == 'POST':
+            params.update(await request.post())
+        if 'path' in request.match_info:
+            params['path'] = request.match_info['path']
+
+        failure = await self._before_call(method)
+        if failure is not None:
+            status, error = failure
+            if error is None:
+                return web.Response(status=status, text='Internal Server Error')
+            return web.json_response({'ok': False, 'error': error}, status=status)
+
+        handler = self._methods.get(method)
+        try:
+            if handler is None:
+                raise _ApiError('UNKNOWN_METHOD')
+            result = handler(params)
+        except _ApiError as e:
+            return web.json_response({'ok': False, 'error': str(e)})
+        return web.json_response({'ok': True, 'result': result})
+
+    async def _handle_upload(self, request: web.Request) -> web.Response:
+        failure = await self._before_call('upload')
+        if failure is not None:
+            return web.Response(status=failure[0], text='Internal Server Error')
+
+        if not request.content_type.startswith('multipart/'):
+            return web.json_response({'error': 'No files passed'})
+
+        result = []
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            data = await part.read()
+            if len(data) > MAX_FILE_SIZE:
+                return web.json_response({'error': 'File too big'})
+            try:
+                result.append({'src': self.add_file(data)})
+            except ValueError as e:
+                return web.json_response({'error': str(e)})
+
+        if not result:
+            return web.json_response({'error': 'No files passed'})
+        return web.json_response(result)
+
+    async def _handle_file(self, request: web.Request) -> web.Response:
+        item = self.files.get(request.match_info['name'])
+        if item is None:
+            raise web.HTTPNotFound()
+        data, content_type = item
+        return web.Response(body=data, content_type=content_type)
+
+    async def _handle_index(self, request: web.Request) -> web.Response:
+        return web.Response(text='<!DOCTYPE html><html><head><title>Telegraph</title></head><body></body></html>',
+                            content_type='text/html')
+
+    def _view_page(self, path: str) -> web.Response:
+        self.add_views(path)
+        page = self.pages[path]
+        title = html.escape(page['title'])
+        text = html.escape(''.join(_iter_text(page['content'])))
+        return web.Response(text=f"<!DOCTYPE html><html><head><title>{title}</title></head>"
+                                 f"<body><h1>{title}</h1><p>{text}</p></body></html>",
+                            content_type='text/html')
+
+    # Methods
+
+    def _get_account(self, params: dict) -> Tuple[str, dict]:
+        token = params.get('access_token')
+        if not token or token not in self.accounts:
+            raise _ApiError('ACCESS_TOKEN_INVALID')
+        return token, self.accounts[token]
+
+    def _new_token(self) -> str:
+        return '%060x' % self._random.getrandbits(240)
+
+    def _auth_url(self) -> str:
+        return f"https://edit.telegra.ph/auth/{self._new_token()[:40]}"
+
+    def _create_account(self, params: dict) -> dict:
+        short_name = params.get('short_name')
+        if not short_name:
+            raise _ApiError('SHORT_NAME_REQUIRED')
+
+        token = self._new_token()
+        self.accounts[token] = account = {
+            'short_name': short_name,
+            'author_name': params.get('author_name', ''),
+            'author_url': params.get('author_url', ''),
+        }
+        return dict(account, access_token=token, auth_url=self._auth_url())
+
+    def _edit_account_info(self, params: dict) -> dict:
+        _, account = self._get_account(params)
+        for field in DEFAULT_ACCOUNT_FIELDS:
+            if field in params:
+                account[field] = params[field]
+        return dict(account)
+
+    def _get_account_info(self, params: dict) -> dict:
+        token, account = self._get_account(params)
+        fields = DEFAULT_ACCOUNT_FIELDS
+        if 'fields' in params:
+            try:
+                fields = json.loads(params['fields'])
+            except ValueError:
+                raise _ApiError('FIELDS_FORMAT_INVALID')
+            if not isinstance(fields, list) or not set(fields) <= set(ACCOUNT_FIELDS):
+                raise _ApiError('FIELDS_FORMAT_INVALID')
+
+        info = dict(account, auth_url=self._auth_url(),
+                    page_count=sum(owner == token for owner in self._owners.values()))
+        return {field: info[field] for field in fields}
+
+    def _revoke_access_token(self, params: dict) -> dict:
+        token, _ = self._get_account(params)
+        new_token = self._new_token()
+        self.accounts[new_token] = self.accounts.pop(token)
+        for path, owner in self._owners.items():
+            if owner == token:
+                self._owners[path] = new_token
+        return {'access_token': new_token, 'auth_url': self._auth_url()}
+
+    def _parse_page_params(self, params: dict) -> dict:
+        title = params.get('title')
+        if not title:
+            raise _ApiError('TITLE_REQUIRED')
+        if 'content' not in params:
+            raise _ApiError('CONTENT_REQUIRED')
+
+        raw_content = params['content']
+        if len(raw_content.encode('utf-8')) > MAX_CONTENT_SIZE:
+            raise _ApiError('CONTENT_TOO_BIG')
+        try:
+            content = json.loads(raw_content)
+        except ValueError:
+            raise _ApiError('CONTENT_FORMAT_INVALID')
+        if not isinstance(content, list):
+            raise _ApiError('CONTENT_FORMAT_INVALID')
+
+        text = ''.join(_iter_text(content))
+        if not text.strip():
+            raise _ApiError('CONTENT_TEXT_REQUIRED')
+
+        return {
+            'title': title,
+            'description': ' '.join(text.split())[:DESCRIPTION_LENGTH],
+            'author_name': params.get('author_name', ''),
+            'author_url': params.get('author_url', ''),
+            'content': content,
+        }
+
+    def _make_path(self, title: str) -> str:
+        now = datetime.datetime.utcnow()
+        base = '-'.join(re.findall(r'\w+', title)) or 'Page'
+        base = f"{base}-{now:%m-%d}"
+        path, number = base, 1
+        while path in self.pages:
+            number += 1
+            path = f"{base}-{number}"
+        return path
+
+    def _page_result(self, path: str, return_content: bool, can_edit: bool = False) -> dict:
+        page = self.pages[path]
+        result = {
+            'path': path,
+            'url': f"https://telegra.ph/{path}",
+            'title': page['title'],
+            'description': page['description'],
+            'views': sum(self._views[path].values()),
+        }
+        for field in ('author_name', 'author_url'):
+            if page[field]:
+                result[field] = page[field]
+        if can_edit:
+            result['can_edit'] = True
+        if return_content:
+            result['content'] = page['content']
+        return result
+
+    def _create_page(self, params: dict) -> dict:
+        token, _ = self._get_account(params)
+        page = self._parse_page_params(params)
+        path = self._make_path(page['title'])
+        self.pages[path] = page
+        self._owners[path] = token
+        return self._page_result(path, _to_bool(params.get('return_content')), can_edit=True)
+
+    def _edit_page(self, params: dict) -> dict:
+        token, _ = self._get_account(params)
+        path = params.get('path')
+        if path not in self.pages:
+            raise _ApiError('PAGE_NOT_FOUND')
+        if self._owners[path] != token:
+            raise _ApiError('PAGE_ACCESS_DENIED')
+        self.pages[path] = self._parse_page_params(params)
+        return self._page_result(path, _to_bool(params.get('return_content')), can_edit=True)
+
+    def _get_page(self, params: dict) -> dict:
+        path = params.get('path')
+        if path not in self.pages:
+            raise _ApiError('PAGE_NOT_FOUND')
+        return self._page_result(path, _to_bool(params.get('return_content')))
+
+    def _get_page_list(self, params: dict) -> dict:
+        token, _ = self._get_account(params)
+        try:
+            offset = int(params.get('offset', 0))
+            limit = int(params.get('limit', PAGE_LIST_DEFAULT_LIMIT))
+        except ValueError:
+            raise _ApiError('LIMIT_INVALID')
+        limit = max(0, min(limit, PAGE_LIST_MAX_LIMIT))
+
+        # Newest pages first
+        paths = [path for path, owner in reversed(list(self._owners.items())) if owner == token]
+        return {
+            'total_count': len(paths),
+            'pages': [self._page_result(path, False, can_edit=True) for path in paths[offset:offset + limit]],
+        }
+
+    def _get_views(self, params: dict) -> dict:
+        path = params.get('path')
+        if path not in self.pages:
+            raise _ApiError('PAGE_NOT_FOUND')
+
+        filters = {}
+        for field in ('year', 'month', 'day', 'hour'):
+            if field in params:
+                try:
+                    filters[field] = int(params[field])
+                except ValueError:
+                    raise _ApiError(f"{field.upper()}_INVALID")
+
+        views = sum(count for when, count in self._views[path].items()
+                    if all(getattr(when, field) == value for field, value in filters.items()))
+        return {'views': views}
+
+
+class FakeTransport(BaseTransport):
+    """
+    Transport routing requests of the client to :class:`FakeTelegraph` regardless of the host
+    """
+
+    def __init__(self, client: TestClient):
+        self._client = client
+
+    async def post(self, url: str, data, headers=None, timeout=None) -> TransportResponse:
+        parts = urlsplit(url)
+        path = parts.path
+        if parts.query:
+            path += '?' + parts.query
+
+        async with self._client.post(path, data=data, headers=headers, **_timeout_kwargs(timeout)) as response:
+            return TransportResponse(status=response.status, body=await response.read())
@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING, Callable, Mapping, Optional, Tuple, Union
+
+from attr import ib, s
+
+if TYPE_CHECKING:
+    import aiohttp
+
+__all__ = ['TransportResponse', 'BaseTransport', 'AiohttpTransport']
+
+
+def _timeout_kwargs(timeout: Union[float, 'aiohttp.ClientTimeout', None]) -> dict:
+    """
+    Generate timeout argument of aiohttp requests
+
+    :param timeout: seconds or ClientTimeout (None - use timeout of the session)
+    :return: dict
+    """
+    if timeout is None:
+        return {}
+
+    import aiohttp
+
+    if not isinstance(timeout, aiohttp.ClientTimeout):
+        timeout = aiohttp.ClientTimeout(total=timeout)
+    return {'timeout': timeout}
+
+
+@s(slots=True)
+class TransportResponse:
+    """
+    Response of the transport: HTTP status and raw body
+    """
+
+    status: int = ib()
+    body: bytes = ib(default=b'')
+
+
+class BaseTransport:
+    """
+    Base class of transports used by :class:`aiograph.Telegraph` for requests to the API and uploads
+
+    Transport receives absolute URL's and request bodies prepared by the client
+    (bytes or :class:`aiohttp.FormData`) and returns status and body of the response.
+    """
+
+    async def post(self, url: str, data, headers: Optional[Mapping[str, str]] = None,
+                   timeout: Union[float, 'aiohttp.ClientTimeout', None] = None) -> TransportResponse:
+        """
+        Send POST request
+
+        :param url: absolute URL
+        :param data: request body
+        :param headers: request headers
+        :param timeout: timeout in seconds or ClientTimeout (None - default timeout)
+        :return: TransportResponse
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(BaseTransport):
+    """
+    Transport sending requests through aiohttp session
+    """
+
+    def __init__(self, get_session: Callable[[], 'aiohttp.ClientSession'],
+                 get_proxy: Optional[Callable[[], Tuple[Optional[str], Optional['aiohttp.BasicAuth']]]] = None):
+        """
+        :param get_session: function returning the session (called for each request, so it can be created lazily)
+        :param get_proxy: function returning HTTP proxy URL and credentials (called for each request,
+            so changes of proxy settings of the client are applied immediately)
+        """
+        self._get_session = get_session
+        self._get_proxy = get_proxy
+
+    async def post(self, url: str, data, headers: Optional[Mapping[str, str]] = None,
+                   timeout: Union[float, 'aiohttp.ClientTimeout', None] = None) -> TransportResponse:
+        proxy, proxy_auth = self._get_proxy() if self._get_proxy is not None else (None, None)
+        async with self._get_session().post(url, data=data, headers=headers, proxy=proxy,
+                                            proxy_auth=proxy_auth, **_timeout_kwargs(timeout)) as response:
+            return TransportResponse(status=response.status, body=await response.read())
@@ -4,7 +4,7 @@ from .base import TelegraphObject
 from .node import NodeElement
 from .page import Page, PagePath
 from .page_list import PageList
-from .page_views import PageViews
+from .page_views import PageViews, ViewsSeries
 
 __all__ = [
     'base',
@@ -15,5 +15,6 @@ __all__ = [
     'PageList',
     'PagePath',
     'PageViews',
-    'TelegraphObject'
+    'TelegraphObject',
+    'ViewsSeries'
 ]
@@ -2,4 +2,4 @@ class TelegraphObject:
     """
     Base class for Telegraph objects
     """
-    pass
+    __slots__ = ()
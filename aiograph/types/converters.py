@@ -1,4 +1,8 @@
-from typing import List, Optional, Union
+from typing import List
+
+from .node import convert_content
+
+__all__ = ['pages_converter', 'convert_content']
 
 
 def pages_converter(raw_pages: List[dict]) -> List['Page']:
@@ -11,23 +15,3 @@ def pages_converter(raw_pages: List[dict]) -> List['Page']:
     from .page import Page
 
     return [Page(**page) for page in raw_pages]
-
-
-def convert_content(value: List[Union[dict, str]]) -> Optional[List[Union[str, 'NodeElement']]]:
-    """
-    Convert raw content to Python objects
-
-    :param value:
-    :return:
-    """
-    from .node import NodeElement
-
-    if value is None:
-        return
-
-    result = []
-    for item in value:
-        if isinstance(item, dict):
-            item = NodeElement(**item)
-        result.append(item)
-    return result
@@ -1,14 +1,27 @@
-from typing import List, Union
+from typing import List, Optional, Union
 
 from attr import ib, s
 
 from .base import TelegraphObject
-from .converters import convert_content
+from ..utils.tags import ALLOWED_TAGS_SET
 
-__all__ = ['NodeElement']
+__all__ = ['NodeElement', 'convert_content']
 
 
-@s
+def convert_content(value: List[Union[dict, str]]) -> Optional[List[Union[str, 'NodeElement']]]:
+    """
+    Convert raw content to Python objects
+
+    :param value:
+    :return:
+    """
+    if value is None:
+        return
+
+    return [NodeElement(**item) if isinstance(item, dict) else item for item in value]
+
+
+@s(slots=True)
 class Node(TelegraphObject):
     """
     This abstract object represents a DOM Node.
@@ -19,7 +32,7 @@ class Node(TelegraphObject):
     pass
 
 
-@s
+@s(slots=True)
 class NodeElement(Node):
     """
     This object represents a DOM element node.
@@ -33,8 +46,7 @@ class NodeElement(Node):
 
     @tag.validator
     def _validate_tag(self, attribute, value):
-        from ..utils import html
-        if value not in html.ALLOWED_TAGS:
+        if value not in ALLOWED_TAGS_SET:
             raise ValueError(f"This tag name is not allowed '{value}'!")
 
     def add(self, content: Union[str, 'NodeElement']):
@@ -1,22 +1,29 @@
 import re
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Union
 
 from attr import ib, s
 
 from .base import TelegraphObject
-from .converters import convert_content
-from .node import NodeElement
+from .node import NodeElement, convert_content
 
 __all__ = ['Page', 'PagePath']
 
 PATH_PATTERN = re.compile('^(?P<name>\S+)-(?P<month>\d{2})-(?P<day>\d{2})(?:-(?P<number>\d))?$', re.I)
 
 
-@s
-class Page(TelegraphObject):
+class _LazyContent(TelegraphObject):
+    # Raw content kept until it's converted to nodes (isn't a field, so it's not compared or exported)
+    __slots__ = ('_raw_content',)
+
+
+@s(slots=True)
+class Page(_LazyContent):
     """
     This object represents a page on Telegraph.
 
+    Content is converted to nodes on first access of `content` attribute,
+    raw content is dropped after that.
+
     Source: http://telegra.ph/api#Page
     """
 
@@ -27,10 +34,49 @@ class Page(TelegraphObject):
     author_name: str = ib(default=None)
     author_url: str = ib(default=None)
     image_url: str = ib(default=None)
-    content: List[Union[str, NodeElement]] = ib(factory=list, converter=convert_content)
+    content: List[Union[str, NodeElement]] = ib(factory=list)
     views: int = ib(default=None)
     can_edit: bool = ib(default=None)
 
+    def __attrs_post_init__(self):
+        # `content` stays unset until the first access, see __getattr__
+        self._raw_content = self.content
+        del self.content
+
+    def __getattr__(self, name: str):
+        # Is called only for unset attributes
+        if name != 'content':
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        raw = self._raw_content
+        del self._raw_content
+        self.content = convert_content(raw)
+        return self.content
+
+    @property
+    def raw_content(self) -> Optional[List[Union[str, dict]]]:
+        """
+        Get content as JSON-serializable list without conversion to nodes
+
+        Can be passed as content to :meth:`aiograph.Telegraph.create_page` and
+        :meth:`aiograph.Telegraph.edit_page`.
+
+        :return:
+        """
+        content = self._current_content()
+        if content is None or not any(isinstance(node, NodeElement) for node in content):
+            return content
+
+        from ..utils.html import nodes_to_json
+        return nodes_to_json(content)
+
+    def _current_content(self) -> Optional[List[Union[str, dict, NodeElement]]]:
+        # Nodes if they are already created or assigned, raw content otherwise
+        try:
+            return object.__getattribute__(self, 'content')
+        except AttributeError:
+            return self._raw_content
+
     @property
     def html_content(self) -> str:
         """
@@ -39,11 +85,27 @@ class Page(TelegraphObject):
         :raise: ValueError if content is not available
         :return:
         """
-        if not self.content:
+        content = self._current_content()
+        if not content:
             raise ValueError('Content is not available!')
 
         from ..utils.html import node_to_html
-        return node_to_html(self.content)
+        return node_to_html(content)
+
+    def iter_html(self, **kwargs) -> Iterator[str]:
+        """
+        Get content as HTML by chunks
+
+        :param kwargs: arguments of :func:`aiograph.utils.html.iter_html`
+        :raise: ValueError if content is not available
+        :return: iterator of strings
+        """
+        content = self._current_content()
+        if not content:
+            raise ValueError('Content is not available!')
+
+        from ..utils.html import iter_html
+        return iter_html(content, **kwargs)
 
     def _parse_path(self):
         if not self.path:
@@ -1,8 +1,11 @@
+import datetime
+from array import array
+
 from attr import ib, s
 
 from .base import TelegraphObject
 
-__all__ = ['PageViews']
+__all__ = ['PageViews', 'ViewsSeries']
 
 
 @s
@@ -13,3 +16,43 @@ class PageViews(TelegraphObject):
     Source: http://telegra.ph/api#PageViews
     """
     views: int = ib()
+
+
+def _int_array(value) -> array:
+    if isinstance(value, array) and value.typecode == 'q':
+        return value
+    return array('q', value)
+
+
+@s
+class ViewsSeries(TelegraphObject):
+    """
+    Time series of page views.
+
+    Data is stored in columns: `timestamps` is an array of starts of buckets (UTC unix time)
+    and `views` is an array of views count in the corresponding bucket.
+    """
+    path: str = ib()
+    granularity: str = ib()
+    timestamps: array = ib(factory=lambda: array('q'), converter=_int_array)
+    views: array = ib(factory=lambda: array('q'), converter=_int_array)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def total(self) -> int:
+        return sum(self.views)
+
+    @property
+    def dates(self):
+        """
+        Starts of buckets as datetime objects
+        """
+        return [datetime.datetime.utcfromtimestamp(timestamp) for timestamp in self.timestamps]
+
+    def items(self):
+        """
+        Iterate over pairs of timestamp and views
+        """
+        return zip(self.timestamps, self.views)
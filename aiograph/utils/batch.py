@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Optional, Union
+
+from attr import ib, s
+
+__all__ = ['BatchResult', 'run_batch', 'DEFAULT_CONCURRENCY']
+
+DEFAULT_CONCURRENCY = 10
+# Max count of unyielded results in ordered mode, in units of concurrency
+ORDERED_WINDOW_FACTOR = 2
+
+
+@s
+class BatchResult:
+    """
+    Result of one item of the batch.
+
+    Exactly one of `result` and `error` is set.
+    """
+
+    index: int = ib()
+    spec: Any = ib(repr=False)
+    result: Any = ib(default=None)
+    error: Optional[BaseException] = ib(default=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self):
+        """
+        Get result or raise the error of this item
+
+        :return: result
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _iterate(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _call(func: Callable[..., Awaitable], index: int, spec) -> BatchResult:
+    try:
+        if isinstance(spec, Mapping):
+            result = await func(**spec)
+        elif isinstance(spec, (tuple, list)):
+            result = await func(*spec)
+        else:
+            result = await func(spec)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return BatchResult(index=index, spec=spec, error=e)
+    return BatchResult(index=index, spec=spec, result=result)
+
+
+async def run_batch(func: Callable[..., Awaitable],
+                    specs: Union[Iterable, AsyncIterable],
+                    concurrency: int = DEFAULT_CONCURRENCY,
+                    ordered: bool = False) -> AsyncIterator[BatchResult]:
+    """
+    Call coroutine function for each spec with limited count of calls in flight.
+
+    Spec can be a mapping (passed as keyword arguments), a tuple or list (passed as positional arguments)
+    or any other object (passed as single argument). Specs are consumed lazily so the source
+    can be a generator or an async generator of any length.
+
+    Errors are not raised but returned inside of :class:`BatchResult` objects.
+
+    :param func: coroutine function
+    :param specs: iterable or async iterable of call specs
+    :param concurrency: max count of calls in flight
+    :param ordered: yield results in submission order instead of completion order
+        (at most `concurrency * ORDERED_WINDOW_FACTOR` results are buffered behind a slow call)
+    :return: async iterator of :class:`BatchResult`
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be greater than 0')
+
+    # In ordered mode results after a slow item are buffered, so count of started
+    # and not yet yielded calls is limited as well
+    window = concurrency * ORDERED_WINDOW_FACTOR if ordered else None
+
+    source = _iterate(specs).__aiter__()
+    exhausted = False
+    pending = set()
+    finished = {}
+    submitted = 0
+    next_index = 0
+
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency \
+                    and (window is None or submitted - next_index < window):
+                try:
+                    spec = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(_call(func, submitted, spec)))
+                submitted += 1
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = task.result()
+                if ordered:
+                    finished[item.index] = item
+                else:
+                    yield item
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await source.aclose()
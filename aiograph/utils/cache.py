@@ -0,0 +1,180 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+__all__ = ['LRUCache', 'ResponseCache', 'DEFAULT_TTL', 'request_key']
+
+# Default time to live of cached responses (in seconds) by method name
+DEFAULT_TTL = {
+    'getAccountInfo': 300,
+    'getPage': 60,
+    'getViews': 60,
+}
+
+_MISSING = object()
+
+
+def request_key(method: str, path: Optional[str] = None, payload: Optional[dict] = None) -> tuple:
+    """
+    Make hashable key of API request
+
+    :param method: API method name
+    :param path: page path (taken from payload when is not passed)
+    :param payload: request payload
+    :return: tuple of method, path and payload items
+    """
+    payload = payload or {}
+    if path is None:
+        path = payload.get('path')
+    return method, path, tuple(sorted(payload.items()))
+
+
+class LRUCache:
+    """
+    In-memory cache with size bound, LRU eviction and optional time to live of items.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        :param maxsize: max count of items
+        :param ttl: default time to live of items in seconds (None - items don't expire)
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be greater than 0')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        """
+        Get item and mark it as recently used
+
+        :param key:
+        :param default: returned if the item is missing or expired
+        :param count: count hit or miss
+        :return: value
+        """
+        item = self._data.get(key)
+        if item is not None:
+            expires, value = item
+            if expires is None or expires > time.monotonic():
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return value
+            del self._data[key]
+
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING):
+        """
+        Store item, evict least recently used items when the cache is full
+
+        :param key:
+        :param value:
+        :param ttl: time to live of the item (by default is used TTL of the cache)
+        """
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove item and return its value
+
+        :param key:
+        :param default: returned if the item is missing or expired
+        :return: value
+        """
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        expires, value = item
+        if expires is not None and expires <= time.monotonic():
+            return default
+        return value
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+
+        :return: dict with hits, misses, evictions and size
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+        }
+
+
+class ResponseCache(LRUCache):
+    """
+    Cache of API responses keyed by method, path and payload.
+
+    Only methods with configured TTL are cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[Dict[str, Optional[float]]] = None):
+        """
+        :param maxsize: max count of cached responses
+        :param ttl: time to live of responses by method name (by default is used :obj:`DEFAULT_TTL`)
+        """
+        super(ResponseCache, self).__init__(maxsize=maxsize)
+        if ttl is None:
+            ttl = DEFAULT_TTL
+        self.methods_ttl = dict(ttl)
+
+    def is_cached(self, method: str) -> bool:
+        return method in self.methods_ttl
+
+    def get_response(self, method: str, path: Optional[str] = None, payload: Optional[dict] = None,
+                     default: Any = None) -> Any:
+        return self.get(request_key(method, path, payload), default)
+
+    def set_response(self, method: str, path: Optional[str], payload: Optional[dict], value: Any):
+        self.set(request_key(method, path, payload), value, ttl=self.methods_ttl[method])
+
+    def invalidate(self, *methods: str, path: Optional[str] = None) -> int:
+        """
+        Drop cached responses of methods and/or path
+
+        :param methods: method names (all methods if not passed)
+        :param path: page path (all paths if not passed)
+        :return: count of dropped responses
+        """
+        count = 0
+        for key in self.keys():
+            key_method, key_path, _ = key
+            if methods and key_method not in methods:
+                continue
+            if path is not None and key_path != path:
+                continue
+            self.pop(key)
+            count += 1
+        return count
@@ -0,0 +1,105 @@
+import hashlib
+from typing import Callable, List, Optional, Union
+
+from . import exceptions
+
+__all__ = ['MAX_CONTENT_SIZE', 'content_size', 'check_content_size', 'split_content', 'page_digest']
+
+# Max size of serialized page content accepted by Telegra.ph
+MAX_CONTENT_SIZE = 64 * 1024
+
+
+def content_size(data: Union[str, bytes]) -> int:
+    """
+    Get count of bytes of serialized content
+
+    :param data: output of JSON serializer
+    :return: size in bytes (UTF-8)
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if data.isascii():
+        return len(data)
+    return len(data.encode('utf-8'))
+
+
+def check_content_size(data: Union[str, bytes], max_size: Optional[int] = MAX_CONTENT_SIZE) -> int:
+    """
+    Raise ContentTooBig if serialized content exceeds the limit
+
+    :param data: output of JSON serializer
+    :param max_size: limit in bytes (None - don't check)
+    :return: size in bytes
+    """
+    size = content_size(data)
+    if max_size is not None and size > max_size:
+        raise exceptions.ContentTooBig.from_size(size, max_size)
+    return size
+
+
+def split_content(nodes: List[Union[str, dict]],
+                  serialize: Callable,
+                  max_size: int = MAX_CONTENT_SIZE,
+                  reserve: int = 0) -> List[List[Union[str, dict]]]:
+    """
+    Split JSON content into parts which fit the size limit
+
+    Content is split only between top-level nodes (paragraphs, headers, figures etc.)
+    so the markup of blocks is never broken. Sizes are computed with the same serializer
+    which is used for requests.
+
+    :param nodes: list of JSON nodes
+    :param serialize: JSON serializer
+    :param max_size: max size of serialized part
+    :param reserve: count of bytes kept free in each part (for navigation links etc.)
+    :raise: ContentTooBig if one of top-level nodes doesn't fit the limit alone
+    :return: list of parts
+    """
+    limit = max_size - reserve
+    empty = content_size(serialize([]))
+    separator = content_size(serialize([0, 0])) - empty - 2 * content_size(serialize(0))
+
+    parts = []
+    current = []
+    size = empty
+    for node in nodes:
+        node_size = content_size(serialize(node))
+        if empty + node_size > limit:
+            raise exceptions.ContentTooBig.from_size(empty + node_size, limit)
+
+        added = node_size + (separator if current else 0)
+        if size + added > limit:
+            parts.append(current)
+            current = []
+            size = empty
+            added = node_size
+        current.append(node)
+        size += added
+
+    if current or not parts:
+        parts.append(current)
+    return parts
+
+
+def page_digest(title: Optional[str], author_name: Optional[str], author_url: Optional[str],
+                content: Union[str, bytes]) -> str:
+    """
+    Hash editable fields of the page
+
+    Missing author fields are treated as empty strings because Telegra.ph doesn't return empty fields.
+
+    :param title: page title
+    :param author_name: author name
+    :param author_url: author profile link
+    :param content: serialized content
+    :return: hex digest
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    for value in (title, author_name, author_url):
+        value = (value or '').encode('utf-8')
+        hasher.update(len(value).to_bytes(4, 'big'))
+        hasher.update(value)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    hasher.update(content)
+    return hasher.hexdigest()
@@ -1,3 +1,6 @@
+import re
+from typing import Optional
+
 # TODO: Find more error types
 
 
@@ -31,9 +34,19 @@ class TelegraphError(Exception):
             if err is cls:
                 continue
             if err.match in match:
-                raise err(err.get_text() or description)
+                raise err.from_description(description)
         raise cls(description)
 
+    @classmethod
+    def from_description(cls, description):
+        """
+        Create error instance from the error description returned by API.
+
+        :param description:
+        :return: error instance
+        """
+        return cls(cls.get_text() or description)
+
 
 class NoFilesPassed(TelegraphError):
     def __init__(self):
@@ -62,3 +75,59 @@ class ContentTextRequired(TelegraphError, match='CONTENT_TEXT_REQUIRED'):
 
 class PageNotFound(TelegraphError, match='PAGE_NOT_FOUND'):
     pass
+
+
+class ContentTooBig(TelegraphError, match='CONTENT_TOO_BIG'):
+    """
+    Serialized content of the page exceeds 64 KB.
+
+    Raised before sending the request when the size is checked on the client side.
+    """
+
+    def __init__(self, message, size: Optional[int] = None, max_size: Optional[int] = None):
+        super(ContentTooBig, self).__init__(message)
+        self.size = size
+        self.max_size = max_size
+
+    @classmethod
+    def from_size(cls, size: int, max_size: int):
+        return cls(f"Content is too big: {size} bytes (limit is {max_size} bytes).", size=size, max_size=max_size)
+
+
+class FloodWait(TelegraphError, match='FLOOD_WAIT'):
+    """
+    Too many requests. The request can be repeated after `retry_after` seconds.
+    """
+
+    def __init__(self, message, retry_after: int = 0):
+        super(FloodWait, self).__init__(message)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_description(cls, description):
+        match = re.search(r'FLOOD_WAIT_(\d+)', description, re.I)
+        retry_after = int(match.group(1)) if match else 0
+        return cls(f"Flood wait! Retry after {retry_after} seconds.", retry_after=retry_after)
+
+
+class ServerError(TelegraphError):
+    """
+    Server responded with 5xx status code.
+    """
+
+    def __init__(self, status: int):
+        super(ServerError, self).__init__(f"Server error: HTTP {status}")
+        self.status = status
+
+
+class FileTooLarge(TelegraphError):
+    """
+    File exceeds the size limit of uploaded files.
+    """
+
+    def __init__(self, size: int, max_size: int, filename=None):
+        name = f"File {filename!r}" if filename else 'File'
+        super(FileTooLarge, self).__init__(f"{name} is too large: {size} bytes (limit is {max_size} bytes).")
+        self.size = size
+        self.max_size = max_size
+        self.filename = filename
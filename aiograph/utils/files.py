@@ -0,0 +1,194 @@
+import asyncio
+import inspect
+import io
+import mmap
+import os
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Tuple
+
+from . import exceptions
+
+__all__ = ['MAX_FILE_SIZE', 'DEFAULT_CHUNK_SIZE', 'guess_filename', 'get_size', 'prepare_file', 'check_size',
+           'iter_chunks', 'sniff_content_type', 'PrefixedReader']
+
+# Max size of uploaded file accepted by Telegra.ph
+MAX_FILE_SIZE = 5 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Signatures of file types supported by Telegra.ph: (offset, magic bytes, content type)
+_SIGNATURES = [
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (4, b'ftyp', 'video/mp4'),
+]
+
+
+def guess_filename(obj):
+    """
+    Get file name from object
+
+    :param obj:
+    :return:
+    """
+    name = getattr(obj, 'name', None)
+    if name and isinstance(name, str) and name[0] != '<' and name[-1] != '>':
+        return os.path.basename(name)
+
+
+def get_size(obj) -> Optional[int]:
+    """
+    Get count of bytes which will be read from the object
+
+    :param obj: bytes-like object, mmap or file object
+    :return: size or None if it can't be detected without reading
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview, mmap.mmap)):
+        return len(obj)
+    if isinstance(obj, io.BytesIO):
+        return obj.getbuffer().nbytes - obj.tell()
+
+    fileno = getattr(obj, 'fileno', None)
+    tell = getattr(obj, 'tell', None)
+    if fileno is None or tell is None or inspect.iscoroutinefunction(tell):
+        return None
+    try:
+        return os.fstat(fileno()).st_size - tell()
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def prepare_file(file) -> Tuple[Optional[str], object, Optional[str], bool]:
+    """
+    Unpack file argument of upload methods
+
+    File can be a path, a file-like object, a tuple of filename and file object
+    or a tuple of filename, file object and content type.
+
+    :param file:
+    :return: filename, file object, content type and flag of the file is opened here
+        and should be closed by the caller
+    """
+    if isinstance(file, tuple):
+        if len(file) == 2:
+            filename, fileobj = file
+            content_type = None
+        elif len(file) == 3:
+            filename, fileobj, content_type = file
+        else:
+            raise ValueError('Tuple must have exactly 2 or 3 elements: filename, fileobj, content_type')
+        return filename, fileobj, content_type, False
+    if isinstance(file, (str, Path)):
+        return os.path.basename(file), open(file, 'rb'), None, True
+    return guess_filename(file), file, None, False
+
+
+def check_size(size: Optional[int], max_size: Optional[int], filename: Optional[str] = None):
+    """
+    Raise FileTooLarge if the size is known and exceeds the limit
+    """
+    if size is not None and max_size is not None and size > max_size:
+        raise exceptions.FileTooLarge(size=size, max_size=max_size, filename=filename)
+
+
+def sniff_content_type(data: bytes) -> Optional[str]:
+    """
+    Detect content type by the first bytes of file
+
+    :param data: beginning of file (at least 12 bytes is recommended)
+    :return: content type or None if the type is unknown
+    """
+    for offset, magic, content_type in _SIGNATURES:
+        if data[offset:offset + len(magic)] == magic:
+            return content_type
+
+
+class PrefixedReader:
+    """
+    Asynchronous reader returning already read bytes before the rest of the stream
+    """
+
+    def __init__(self, prefix: bytes, stream):
+        """
+        :param prefix: bytes read from the stream before
+        :param stream: object with `read(size)` coroutine method
+        """
+        self._prefix = prefix
+        self._stream = stream
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._prefix:
+            if size < 0:
+                size = len(self._prefix)
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        return await self._stream.read(size)
+
+
+async def iter_chunks(obj,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      max_size: Optional[int] = MAX_FILE_SIZE,
+                      progress: Optional[Callable[[Optional[str], int, Optional[int]], None]] = None,
+                      filename: Optional[str] = None,
+                      hasher=None) -> AsyncIterator[bytes]:
+    """
+    Read object by chunks
+
+    Supported objects: bytes-like objects, mmap, file objects and objects
+    with `read(size)` coroutine method (for example aiofiles).
+    Synchronous file objects (except of BytesIO) are read in the default executor.
+
+    :param obj: source
+    :param chunk_size: max size of chunk
+    :param max_size: max count of bytes, FileTooLarge is raised when it's exceeded
+    :param progress: callback receiving filename, count of sent bytes and total size (None if unknown)
+    :param filename: name of file passed to progress callback
+    :param hasher: hash object updated with each chunk (from :mod:`hashlib`)
+    :return: async iterator of bytes
+    """
+    total = get_size(obj)
+    check_size(total, max_size, filename)
+    sent = 0
+
+    if isinstance(obj, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(obj)
+
+        async def read(size):
+            return view[sent:sent + size]
+    elif isinstance(obj, io.BytesIO) or inspect.iscoroutinefunction(obj.read):
+        reader = obj.read
+
+        async def read(size):
+            data = reader(size)
+            if inspect.isawaitable(data):
+                data = await data
+            return data
+    else:
+        # Blocking reads of files are done in the executor as aiohttp does
+        reader = obj.read
+        loop = asyncio.get_event_loop()
+
+        async def read(size):
+            data = await loop.run_in_executor(None, reader, size)
+            if inspect.isawaitable(data):
+                data = await data
+            return data
+
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            raise TypeError('File must be opened in binary mode')
+
+        sent += len(chunk)
+        check_size(sent, max_size, filename)
+
+        chunk = bytes(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+        yield chunk
+
+        if progress is not None:
+            progress(filename, sent, total)
@@ -1,72 +1,117 @@
-from html import escape
+import re
+from html import escape, unescape
 from html.entities import name2codepoint
 from html.parser import HTMLParser
-from typing import List, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 import attr
 
 from ..types import NodeElement
+from ..types.converters import convert_content
+# ALLOWED_TAGS and ALLOWED_ATTRS were defined here before, they are re-exported for compatibility
+from .tags import ALLOWED_ATTRS, ALLOWED_TAGS  # noqa: F401
+from .tags import ALLOWED_TAGS_SET, VOID_ELEMENTS
 
-ALLOWED_TAGS = [
-    'a', 'aside', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure',
-    'h3', 'h4', 'hr', 'i', 'iframe', 'img', 'li', 'ol', 'p', 'pre', 's',
-    'strong', 'u', 'ul', 'video'
-]
-VOID_ELEMENTS = {
-    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
-    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr'
-}
-ALLOWED_ATTRS = ['href', 'src']
 
+DEFAULT_HTML_CHUNK_SIZE = 16 * 1024
 
-def node_to_html(node: Union[str, NodeElement, list]) -> str:
+
+def _iter_html_parts(node: Union[str, NodeElement, list]) -> Iterator[str]:
     """
-    Convert Nodes to HTML
+    Render nodes to small parts of HTML
 
-    :param node:
-    :return:
+    Tree is traversed with explicit stack so the depth of nodes is not limited by the recursion limit.
     """
-    if isinstance(node, str):  # Text
-        return escape(node)
+    if not isinstance(node, list):
+        node = [node]
+
+    # Pairs of iterator over children and closing tag of their parent
+    stack = [(iter(node), None)]
+    while stack:
+        children, close_tag = stack[-1]
+        for child in children:
+            if isinstance(child, str):  # Text
+                yield escape(child)
+                continue
+            elif isinstance(child, NodeElement):
+                tag, attrs, children = child.tag, child.attrs, child.children
+            elif isinstance(child, dict):  # Raw JSON node
+                tag, attrs, children = child['tag'], child.get('attrs'), child.get('children', ())
+            else:
+                raise TypeError(f"Node must be instance of str or NodeElement, not {type(child)}")
+
+            # Open
+            if attrs:
+                yield '<' + tag + ' ' + ' '.join(f"{k}=\"{v}\"" for k, v in attrs.items())
+            else:
+                yield '<' + tag
+
+            if tag in VOID_ELEMENTS:  # Close void element
+                yield '/>'
+            else:
+                yield '>'
+                # Container body
+                stack.append((iter(children), '</' + tag + '>'))
+                break
+        else:
+            stack.pop()
+            if close_tag is not None:  # Close tag
+                yield close_tag
 
-    elif isinstance(node, list):  # List of nodes
-        result = ''
-        for child_node in node:
-            result += node_to_html(child_node)
-        return result
 
-    elif not isinstance(node, NodeElement):
-        raise TypeError(f"Node must be instance of str or NodeElement, not {type(node)}")
+def iter_html(nodes: Union[str, NodeElement, list], chunk_size: Optional[int] = DEFAULT_HTML_CHUNK_SIZE
+              ) -> Iterator[str]:
+    """
+    Convert Nodes to HTML by chunks
 
-    # NodeElement
+    Usage:
 
-    # Open
-    result = "<" + node.tag
-    if node.attrs:
-        result += ' ' + ' '.join(f"{k}=\"{v}\"" for k, v in node.attrs.items())
+    .. code-block:: python3
 
-    if node.tag in VOID_ELEMENTS:  # Close void element
-        result += '/>'
-    else:
-        result += '>'
-        for child_node in node.children:  # Container body
-            result += node_to_html(child_node)
-        result += '</' + node.tag + '>'  # Close tag
+        for chunk in iter_html(page.content):
+            await response.write(chunk.encode())
 
-    return result
+    :param nodes:
+    :param chunk_size: min length of chunk (None - yield each tag and text separately)
+    :return: iterator of strings
+    """
+    if not chunk_size:
+        yield from _iter_html_parts(nodes)
+        return
+
+    buffer = []
+    size = 0
+    for part in _iter_html_parts(nodes):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
 
 
-def html_to_nodes(html_content: str) -> List[Union[str, NodeElement]]:
+def node_to_html(node: Union[str, NodeElement, list]) -> str:
+    """
+    Convert Nodes to HTML
+
+    :param node:
+    :return:
+    """
+    return ''.join(_iter_html_parts(node))
+
+
+def html_to_nodes(html_content: str, backend: Union[str, 'ParserBackend', None] = None
+                  ) -> List[Union[str, NodeElement]]:
     """
     Convert HTML code to Nodes
 
     :param html_content:
+    :param backend: parser backend or its name (see :func:`get_parser_backend`)
     :return:
     """
-    parser = HtmlToNodesParser()
-    parser.feed(html_content)
-
-    return parser.get_nodes()
+    return get_parser_backend(backend).html_to_nodes(html_content)
 
 
 def _node_converter_filter(attribute, value) -> bool:
@@ -77,26 +122,32 @@ def nodes_to_json(nodes: List[Union[str, NodeElement]]) -> List[Union[str, dict]
     """
     Convert Nodes to JSON
 
+    Raw JSON nodes (dicts) are passed as is.
+
     :param nodes:
     :return:
     """
     result = []
     for node in nodes:
-        if isinstance(node, str):
+        if isinstance(node, (str, dict)):
             result.append(node)
         elif isinstance(node, NodeElement):
             result.append(attr.asdict(node, filter=_node_converter_filter))
     return result
 
 
-def html_to_json(content: str) -> List[Union[str, dict]]:
+def html_to_json(content: str, backend: Union[str, 'ParserBackend', None] = None) -> List[Union[str, dict]]:
     """
     Convert HTML to JSON
 
+    Result is the same as of `nodes_to_json(html_to_nodes(content))`
+    but NodeElement objects are not created.
+
     :param content:
+    :param backend: parser backend or its name (see :func:`get_parser_backend`)
     :return:
     """
-    return nodes_to_json(html_to_nodes(content))
+    return get_parser_backend(backend).html_to_json(content)
 
 
 class HtmlToNodesParser(HTMLParser):
@@ -116,7 +167,7 @@ class HtmlToNodesParser(HTMLParser):
             self.current_nodes.append(s)
 
     def handle_starttag(self, tag, attrs_list):
-        if tag not in ALLOWED_TAGS:
+        if tag not in ALLOWED_TAGS_SET:
             self.error(f"{tag} tag is not allowed")
 
         node = NodeElement(tag=tag)
@@ -134,6 +185,8 @@ class HtmlToNodesParser(HTMLParser):
     def handle_endtag(self, tag):
         if tag in VOID_ELEMENTS:
             return
+        if not self.parent_nodes:
+            self.error(f"\"{tag}\" tag is not opened")
 
         self.current_nodes = self.parent_nodes.pop()
 
@@ -165,3 +218,234 @@ class HtmlToNodesParser(HTMLParser):
             self.error(f"\"{not_closed_tag}\" tag is not closed")
 
         return self.current_nodes
+
+
+class HtmlToJsonParser(HTMLParser):
+    """
+    Parse HTML directly to JSON-serializable nodes (dicts and strings)
+    """
+
+    def __init__(self):
+        super(HtmlToJsonParser, self).__init__()
+
+        self.current_nodes = []
+        self.parent_nodes = []
+
+    def error(self, message):
+        raise ValueError(message)
+
+    def add_str_node(self, s):
+        if self.current_nodes and isinstance(self.current_nodes[-1], str):
+            self.current_nodes[-1] += s
+        else:
+            self.current_nodes.append(s)
+
+    def handle_starttag(self, tag, attrs_list):
+        if tag not in ALLOWED_TAGS_SET:
+            self.error(f"{tag} tag is not allowed")
+
+        node = {'tag': tag}
+        if attrs_list:
+            node['attrs'] = dict(attrs_list)
+
+        self.current_nodes.append(node)
+
+        if tag not in VOID_ELEMENTS:
+            self.parent_nodes.append(self.current_nodes)
+            self.current_nodes = []
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if not self.parent_nodes:
+            self.error(f"\"{tag}\" tag is not opened")
+
+        children = self.current_nodes
+        self.current_nodes = self.parent_nodes.pop()
+
+        last_node = self.current_nodes[-1]
+
+        if last_node['tag'] != tag:
+            self.error(f"\"{tag}\" tag closed instead of \"{last_node['tag']}\"")
+
+        if children:
+            last_node['children'] = children
+
+    def handle_data(self, data):
+        self.add_str_node(data)
+
+    def handle_entityref(self, name):
+        self.add_str_node(chr(name2codepoint[name]))
+
+    def handle_charref(self, name):
+        if name.startswith('x'):
+            c = chr(int(name[1:], 16))
+        else:
+            c = chr(int(name))
+
+        self.add_str_node(c)
+
+    def get_nodes(self):
+        if self.parent_nodes:
+            not_closed_tag = self.parent_nodes[-1][-1]['tag']
+            self.error(f"\"{not_closed_tag}\" tag is not closed")
+
+        return self.current_nodes
+
+
+class ParserBackend:
+    """
+    Base class of HTML parser backends
+
+    Backends must accept only :obj:`ALLOWED_TAGS`, must not expect closing tags
+    of :obj:`VOID_ELEMENTS` and must raise ValueError on tags closed in the wrong order
+    or not closed at all, like the standard library based parser does.
+    """
+    name = None
+
+    def html_to_json(self, content: str) -> List[Union[str, dict]]:
+        raise NotImplementedError
+
+    def html_to_nodes(self, content: str) -> List[Union[str, NodeElement]]:
+        return convert_content(self.html_to_json(content))
+
+
+class StdlibParserBackend(ParserBackend):
+    """
+    Parser based on :class:`html.parser.HTMLParser`
+    """
+    name = 'stdlib'
+
+    def html_to_json(self, content: str) -> List[Union[str, dict]]:
+        parser = HtmlToJsonParser()
+        parser.feed(content)
+
+        return parser.get_nodes()
+
+    def html_to_nodes(self, content: str) -> List[Union[str, NodeElement]]:
+        parser = HtmlToNodesParser()
+        parser.feed(content)
+
+        return parser.get_nodes()
+
+
+class _Fallback(Exception):
+    pass
+
+
+_NUMERIC_CHARREF = re.compile(r'&#(?:[xX]([0-9a-fA-F]+)|([0-9]+));')
+
+
+def _has_html_only_charrefs(content: str) -> bool:
+    """
+    Check if content has numeric character references decoded by HTML rules differently than by XML rules
+    (for example HTML maps 0x80-0x9F to Windows-1252 characters and drops some control characters)
+    """
+    for match in _NUMERIC_CHARREF.finditer(content):
+        hex_value, dec_value = match.groups()
+        codepoint = int(hex_value, 16) if hex_value else int(dec_value)
+        if codepoint > 0x10FFFF or unescape(match.group(0)) != chr(codepoint):
+            return True
+    return False
+
+
+class LxmlParserBackend(StdlibParserBackend):
+    """
+    Parser based on libxml2 (requires `lxml` package)
+
+    HTML parser of libxml2 silently repairs the document structure (closes and moves tags),
+    so its strict XML parser is used instead: it doesn't change the structure and is able to parse
+    well-formed content (like content generated by :func:`node_to_html`). Any content which
+    can be treated differently by the XML parser and the standard library parser
+    (HTML entities, numeric references decoded by HTML rules, unquoted or uppercase attributes,
+    unclosed void elements, syntax errors, etc.)
+    is passed to the standard library parser, so results and errors are always the same.
+    """
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree
+
+        self._etree = etree
+        self._parser = etree.XMLParser(resolve_entities=False, no_network=True,
+                                       remove_comments=True, remove_pis=True)
+
+    def html_to_json(self, content: str) -> List[Union[str, dict]]:
+        if '\r' in content or '<!' in content.replace('<!--', ''):
+            # XML parser normalizes line endings and treats declarations differently
+            return super(LxmlParserBackend, self).html_to_json(content)
+        if '&#' in content and _has_html_only_charrefs(content):
+            return super(LxmlParserBackend, self).html_to_json(content)
+
+        try:
+            root = self._etree.fromstring(f"<root>{content}</root>", self._parser)
+            # XML parser normalizes whitespaces in attribute values
+            check_attrs = '\n' in content or '\t' in content
+            result = []
+            self._convert_children(root, result, check_attrs)
+        except (_Fallback, self._etree.LxmlError, ValueError, RecursionError):
+            return super(LxmlParserBackend, self).html_to_json(content)
+        return result
+
+    def _convert_children(self, element, result: list, check_attrs: bool):
+        if element.text:
+            result.append(element.text)
+
+        for child in element:
+            tag = child.tag
+            if tag not in ALLOWED_TAGS_SET:
+                raise _Fallback()
+
+            node = {'tag': tag}
+            if child.attrib:
+                attrs = dict(child.attrib)
+                for key, value in attrs.items():
+                    if key != key.lower() or (check_attrs and ' ' in value):
+                        raise _Fallback()
+                node['attrs'] = attrs
+            result.append(node)
+
+            if tag in VOID_ELEMENTS:
+                if child.text or len(child):
+                    raise _Fallback()
+            else:
+                children = []
+                self._convert_children(child, children, check_attrs)
+                if children:
+                    node['children'] = children
+
+            if child.tail:
+                result.append(child.tail)
+
+
+PARSER_BACKENDS = {
+    StdlibParserBackend.name: StdlibParserBackend,
+    LxmlParserBackend.name: LxmlParserBackend,
+}
+_backends: Dict[str, ParserBackend] = {}
+
+
+def get_parser_backend(backend: Union[str, ParserBackend, None] = None) -> ParserBackend:
+    """
+    Get HTML parser backend
+
+    :param backend: backend instance or name: 'stdlib', 'lxml' or 'auto'
+        ('lxml' when it's installed otherwise 'stdlib'), by default is used 'stdlib'
+    :return: ParserBackend
+    """
+    if isinstance(backend, ParserBackend):
+        return backend
+    if backend is None:
+        backend = StdlibParserBackend.name
+    elif backend == 'auto':
+        try:
+            return get_parser_backend(LxmlParserBackend.name)
+        except ImportError:
+            return get_parser_backend(StdlibParserBackend.name)
+
+    instance = _backends.get(backend)
+    if instance is None:
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {backend!r}")
+        instance = _backends[backend] = PARSER_BACKENDS[backend]()
+    return instance
@@ -0,0 +1,125 @@
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+__all__ = ['JsonCodec', 'StdlibJsonCodec', 'UJsonCodec', 'OrjsonCodec', 'CustomJsonCodec',
+           'JSON_CODECS', 'get_json_codec']
+
+
+class JsonCodec:
+    """
+    Base class of JSON codecs
+
+    `dumps` returns the native output of the library (str or bytes) so it can be passed
+    to the request body without conversion, `loads` accepts both bytes and str.
+    """
+    name = None
+
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        raise NotImplementedError
+
+    def dumps_str(self, obj: Any) -> str:
+        data = self.dumps(obj)
+        if isinstance(data, bytes):
+            return data.decode('utf-8')
+        return data
+
+
+class StdlibJsonCodec(JsonCodec):
+    """
+    Codec based on :mod:`json` module
+    """
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class UJsonCodec(JsonCodec):
+    """
+    Codec based on `ujson` package
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> str:
+        return self._ujson.dumps(obj, ensure_ascii=False)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._ujson.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec based on `orjson` package (serializes to bytes)
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class CustomJsonCodec(JsonCodec):
+    """
+    Codec made of user-defined functions
+
+    Deserializer receives str as `json.loads` does.
+    """
+    name = 'custom'
+
+    def __init__(self, serialize: Callable[[Any], Union[str, bytes]], deserialize: Callable[[str], Any]):
+        self.dumps = serialize
+        self._deserialize = deserialize
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return self._deserialize(data)
+
+
+JSON_CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UJsonCodec.name: UJsonCodec,
+    StdlibJsonCodec.name: StdlibJsonCodec,
+}
+_codecs: Dict[str, JsonCodec] = {}
+
+
+def get_json_codec(codec: Union[str, JsonCodec, None] = None) -> JsonCodec:
+    """
+    Get JSON codec
+
+    :param codec: codec instance or name: 'orjson', 'ujson', 'json' or 'auto'
+        (the fastest installed one), by default is used 'auto'
+    :return: JsonCodec
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None or codec == 'auto':
+        for name in JSON_CODECS:
+            try:
+                return get_json_codec(name)
+            except ImportError:
+                continue
+
+    instance: Optional[JsonCodec] = _codecs.get(codec)
+    if instance is None:
+        if codec not in JSON_CODECS:
+            raise ValueError(f"Unknown JSON codec: {codec!r}")
+        instance = _codecs[codec] = JSON_CODECS[codec]()
+    return instance
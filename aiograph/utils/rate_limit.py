@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Dict, Hashable, Optional
+
+__all__ = ['TokenBucket', 'RateLimiter']
+
+
+class TokenBucket:
+    """
+    Token bucket.
+
+    Allows `capacity` requests at once and `rate` requests per second in average.
+    Waiters are served in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: count of tokens added per second
+        :param capacity: max count of accumulated tokens (burst size), by default is equal to the rate
+        """
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+        if capacity is None:
+            capacity = max(1.0, rate)
+        if capacity < 1:
+            raise ValueError('capacity must be greater or equal to 1')
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """
+        Count of currently available tokens
+        """
+        self._refill()
+        return self._tokens
+
+    async def acquire(self):
+        """
+        Wait until the token is available and take it
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Set of token buckets with the same settings, one per key (for example per access token).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: count of requests per second for each key
+        :param capacity: max burst size for each key
+        """
+        # Validate settings
+        TokenBucket(rate, capacity)
+
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def get_bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+        return bucket
+
+    async def acquire(self, key: Hashable = None):
+        """
+        Wait for the permission to make request for the key
+
+        :param key:
+        """
+        await self.get_bucket(key).acquire()
+
+    def move(self, old_key: Hashable, new_key: Hashable):
+        """
+        Move the bucket to another key (for example after revoking access token,
+        the account is the same so its limit should be kept)
+
+        :param old_key:
+        :param new_key:
+        """
+        bucket = self._buckets.pop(old_key, None)
+        if bucket is not None:
+            self._buckets[new_key] = bucket
@@ -0,0 +1,108 @@
+import asyncio
+import random
+from typing import Iterable, Optional
+
+from . import exceptions
+
+__all__ = ['RetryPolicy', 'IDEMPOTENT_METHODS']
+
+# Methods which can be safely repeated when the result of the previous attempt is unknown
+IDEMPOTENT_METHODS = frozenset({
+    'editAccountInfo',
+    'editPage',
+    'getAccountInfo',
+    'getPage',
+    'getPageList',
+    'getViews',
+})
+
+
+class RetryPolicy:
+    """
+    Retry policy of API requests.
+
+    Errors that guarantee the request was not processed (flood wait, failed connection)
+    are retried for all methods. Errors after which the result of the request is unknown
+    (timeouts, dropped connections, 5xx responses) are retried only for idempotent methods,
+    so `createPage` is never duplicated.
+
+    Override :meth:`get_delay` to implement a custom policy.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 5,
+                 backoff: float = 0.5,
+                 max_backoff: float = 30.0,
+                 jitter: bool = True,
+                 max_flood_wait: Optional[float] = 60.0,
+                 idempotent_methods: Optional[Iterable[str]] = None):
+        """
+        :param max_attempts: max count of attempts (including the first one)
+        :param backoff: delay before the first retry, doubled with each next attempt
+        :param max_backoff: max delay between attempts
+        :param jitter: randomize delays to avoid synchronized retries from many clients
+        :param max_flood_wait: max delay requested by the server that will be waited (None - unlimited)
+        :param idempotent_methods: names of methods which can be safely repeated
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be greater than 0')
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_flood_wait = max_flood_wait
+        if idempotent_methods is None:
+            idempotent_methods = IDEMPOTENT_METHODS
+        self.idempotent_methods = frozenset(idempotent_methods)
+
+    def is_idempotent(self, method: str) -> bool:
+        return method in self.idempotent_methods
+
+    def is_retryable(self, method: str, error: BaseException) -> bool:
+        """
+        Check the request can be repeated after this error
+
+        :param method: API method name
+        :param error: raised exception
+        :return: bool
+        """
+        import aiohttp
+
+        if isinstance(error, (exceptions.FloodWait, aiohttp.ClientConnectorError)):
+            return True
+        if isinstance(error, (exceptions.ServerError, aiohttp.ClientConnectionError,
+                              aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+            return self.is_idempotent(method)
+        return False
+
+    def compute_backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff delay after the attempt
+
+        :param attempt: number of failed attempt (starts from 1)
+        :return: delay in seconds
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def get_delay(self, method: str, attempt: int, error: BaseException) -> Optional[float]:
+        """
+        Get delay before the next attempt
+
+        :param method: API method name
+        :param attempt: number of failed attempt (starts from 1)
+        :param error: raised exception
+        :return: delay in seconds or None if the error should be raised
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(method, error):
+            return None
+
+        if isinstance(error, exceptions.FloodWait):
+            if self.max_flood_wait is not None and error.retry_after > self.max_flood_wait:
+                return None
+            return error.retry_after + self.compute_backoff(1)
+
+        return self.compute_backoff(attempt)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+__all__ = ['SingleFlight', 'COALESCED_METHODS']
+
+# Read-only methods which results can be shared between identical concurrent requests
+COALESCED_METHODS = frozenset({
+    'getAccountInfo',
+    'getPage',
+    'getPageList',
+    'getViews',
+})
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into one.
+
+    While the call with some key is in flight, next calls with the same key
+    don't start a new one but wait for the result of the first call.
+    """
+
+    def __init__(self, methods: Optional[Iterable[str]] = None):
+        """
+        :param methods: names of API methods to be coalesced (by default is used :obj:`COALESCED_METHODS`)
+        """
+        if methods is None:
+            methods = COALESCED_METHODS
+        self.methods = frozenset(methods)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+        self.calls = 0
+        self.collapsed = 0
+
+    def is_coalesced(self, method: str) -> bool:
+        return method in self.methods
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable],
+                 copy: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Call the function or join the call with the same key which is already in flight
+
+        The call is executed in separate task so cancellation of one of the waiters
+        doesn't affect other waiters.
+
+        :param key: call key
+        :param func: function returning awaitable
+        :param copy: function used to copy the result for joined callers
+        :return: result of the call
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            result = await asyncio.shield(task)
+            if copy is not None:
+                result = copy(result)
+            return result
+
+        self.calls += 1
+        task = asyncio.ensure_future(func())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark exception as retrieved when all of waiters are cancelled
+            task.exception()
+
+    def stats(self):
+        """
+        Get counters
+
+        :return: dict with count of executed and collapsed calls
+        """
+        return {
+            'calls': self.calls,
+            'collapsed': self.collapsed,
+            'in_flight': self.in_flight,
+        }
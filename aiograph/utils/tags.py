@@ -0,0 +1,13 @@
+__all__ = ['ALLOWED_TAGS', 'ALLOWED_TAGS_SET', 'VOID_ELEMENTS', 'ALLOWED_ATTRS']
+
+ALLOWED_TAGS = [
+    'a', 'aside', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure',
+    'h3', 'h4', 'hr', 'i', 'iframe', 'img', 'li', 'ol', 'p', 'pre', 's',
+    'strong', 'u', 'ul', 'video'
+]
+ALLOWED_TAGS_SET = frozenset(ALLOWED_TAGS)
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr'
+}
+ALLOWED_ATTRS = ['href', 'src']
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import inspect
+import mmap
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .cache import LRUCache
+from .files import DEFAULT_CHUNK_SIZE
+
+__all__ = ['BaseUploadCache', 'MemoryUploadCache', 'SQLiteUploadCache', 'new_hasher', 'hash_content',
+           'hash_content_async']
+
+
+def new_hasher():
+    """
+    Create hash object used for file content
+    """
+    return hashlib.blake2b(digest_size=20)
+
+
+def hash_content(obj, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+    """
+    Hash content of bytes-like object or seekable file object by chunks
+
+    Position of the file is restored after reading, so on a cache miss the file
+    is read twice: here and when it's uploaded.
+
+    :param obj: bytes-like object, mmap or file object
+    :param chunk_size: size of chunk
+    :return: hex digest or None if the object can't be read twice
+    """
+    hasher = new_hasher()
+
+    if isinstance(obj, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(obj)
+        for offset in range(0, len(view), chunk_size):
+            hasher.update(view[offset:offset + chunk_size])
+        return hasher.hexdigest()
+
+    seekable = getattr(obj, 'seekable', None)
+    if seekable is None or inspect.iscoroutinefunction(seekable) or not seekable():
+        return None
+
+    position = obj.tell()
+    try:
+        while True:
+            chunk = obj.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    finally:
+        obj.seek(position)
+    return hasher.hexdigest()
+
+
+async def hash_content_async(obj, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[str]:
+    """
+    Hash content like :func:`hash_content` does, but in the default executor (reading and hashing are blocking)
+
+    :param obj: bytes-like object, mmap or file object
+    :param chunk_size: size of chunk
+    :return: hex digest or None if the object can't be read twice
+    """
+    seekable = getattr(obj, 'seekable', None)
+    if seekable is not None and inspect.iscoroutinefunction(seekable):
+        return None
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, hash_content, obj, chunk_size)
+
+
+class BaseUploadCache:
+    """
+    Storage of paths of uploaded files by hash of their content
+    """
+
+    async def get(self, digest: str) -> Optional[str]:
+        """
+        Get path of uploaded file
+
+        :param digest: hash of file content
+        :return: path or None
+        """
+        raise NotImplementedError
+
+    async def set(self, digest: str, src: str):
+        """
+        Save path of uploaded file
+
+        :param digest: hash of file content
+        :param src: path of file on Telegra.ph
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryUploadCache(BaseUploadCache):
+    """
+    In-memory storage with LRU eviction
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    async def get(self, digest: str) -> Optional[str]:
+        return self._cache.get(digest)
+
+    async def set(self, digest: str, src: str):
+        self._cache.set(digest, src)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SQLiteUploadCache(BaseUploadCache):
+    """
+    Persistent storage in SQLite database
+
+    Queries are executed in a dedicated thread, so they don't block the event loop.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path to the database file
+        """
+        self.path = path
+        # One worker thread uses the connection, so queries are serialized
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS uploads (digest TEXT PRIMARY KEY, src TEXT NOT NULL)')
+        self._connection.commit()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get(self, digest: str) -> Optional[str]:
+        row = self._connection.execute('SELECT src FROM uploads WHERE digest = ?', (digest,)).fetchone()
+        if row is not None:
+            return row[0]
+
+    def _set(self, digest: str, src: str):
+        self._connection.execute('INSERT OR REPLACE INTO uploads (digest, src) VALUES (?, ?)', (digest, src))
+        self._connection.commit()
+
+    async def get(self, digest: str) -> Optional[str]:
+        return await self._run(self._get, digest)
+
+    async def set(self, digest: str, src: str):
+        await self._run(self._set, digest, src)
+
+    async def close(self):
+        await self._run(self._connection.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,85 @@
+import datetime
+from typing import Dict, Iterator, Tuple, Union
+
+__all__ = ['GRANULARITIES', 'iter_buckets', 'bucket_end', 'bucket_params']
+
+GRANULARITIES = ('year', 'month', 'day', 'hour')
+
+
+def _floor(value: Union[datetime.date, datetime.datetime], granularity: str) -> datetime.datetime:
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    if granularity == 'year':
+        return datetime.datetime(value.year, 1, 1)
+    if granularity == 'month':
+        return datetime.datetime(value.year, value.month, 1)
+    if granularity == 'day':
+        return datetime.datetime(value.year, value.month, value.day)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_end(start: datetime.datetime, granularity: str) -> datetime.datetime:
+    """
+    Get start of the next bucket
+
+    :param start: start of the bucket
+    :param granularity: one of :obj:`GRANULARITIES`
+    :return: datetime
+    """
+    if granularity == 'year':
+        return start.replace(year=start.year + 1)
+    if granularity == 'month':
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if granularity == 'day':
+        return start + datetime.timedelta(days=1)
+    return start + datetime.timedelta(hours=1)
+
+
+def bucket_params(start: datetime.datetime, granularity: str) -> Dict[str, int]:
+    """
+    Get arguments of `getViews` method for the bucket
+
+    :param start: start of the bucket
+    :param granularity: one of :obj:`GRANULARITIES`
+    :return: dict with year, month, day and hour
+    """
+    params = {'year': start.year}
+    if granularity in ('month', 'day', 'hour'):
+        params['month'] = start.month
+    if granularity in ('day', 'hour'):
+        params['day'] = start.day
+    if granularity == 'hour':
+        params['hour'] = start.hour
+    return params
+
+
+def iter_buckets(start: Union[datetime.date, datetime.datetime],
+                 end: Union[datetime.date, datetime.datetime],
+                 granularity: str) -> Iterator[Tuple[datetime.datetime, Dict[str, int]]]:
+    """
+    Iterate over buckets between dates (both are included)
+
+    Naive datetime objects are treated as UTC.
+
+    :param start: first date
+    :param end: last date (date includes all hours of the day)
+    :param granularity: one of :obj:`GRANULARITIES`
+    :return: iterator of pairs of the bucket start and `getViews` arguments
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    if not isinstance(end, datetime.datetime):
+        # Date includes all hours of the day
+        end = datetime.datetime.combine(end, datetime.time.max)
+
+    current = _floor(start, granularity)
+    end = _floor(end, granularity)
+    while current <= end:
+        yield current, bucket_params(current, granularity)
+        current = bucket_end(current, granularity)
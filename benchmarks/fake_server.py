@@ -0,0 +1,63 @@
+"""
+Measure throughput of batch page creation against in-process fake Telegra.ph
+with simulated network latency, and cost of retries under random server errors.
+
+Usage: python benchmarks/fake_server.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiograph.testing import FakeTelegraph  # noqa: E402
+from aiograph.utils.retry import RetryPolicy  # noqa: E402
+
+LATENCY = 0.02
+PAGES = 200
+CONTENT = '<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit.</p>' * 20
+
+
+async def create_pages(concurrency: int):
+    async with FakeTelegraph(latency=LATENCY) as server:
+        async with server.telegraph() as telegraph:
+            await telegraph.create_account('bench')
+            specs = [{'title': f"Page {i}", 'content': CONTENT} for i in range(PAGES)]
+
+            start = time.monotonic()
+            results = [item async for item in telegraph.create_pages(specs, concurrency=concurrency)]
+            elapsed = time.monotonic() - start
+
+    assert all(item.ok for item in results)
+    print(f"concurrency {concurrency:>3}: {PAGES / elapsed:8.1f} pages/s ({elapsed:.2f} s)")
+
+
+async def retries(error_rate: float):
+    async with FakeTelegraph(latency=LATENCY, seed=1) as server:
+        policy = RetryPolicy(max_attempts=10, backoff=0.01, jitter=False)
+        async with server.telegraph(retry_policy=policy) as telegraph:
+            await telegraph.create_account('bench')
+            page = await telegraph.create_page('Page', CONTENT)
+            server.error_rate = error_rate
+
+            start = time.monotonic()
+            await asyncio.gather(*(telegraph.get_page(page.path) for _ in range(PAGES)))
+            elapsed = time.monotonic() - start
+
+    print(f"error rate {error_rate:.1f}: {server.calls['getPage'] / PAGES:.2f} requests per call, "
+          f"{elapsed:.2f} s for {PAGES} calls")
+
+
+async def main():
+    print(f"create_pages, {PAGES} pages, latency {LATENCY * 1000:.0f} ms")
+    for concurrency in (1, 5, 20, 50):
+        await create_pages(concurrency)
+
+    print(f"get_page with retries, {PAGES} concurrent calls")
+    for error_rate in (0, 0.1, 0.3):
+        await retries(error_rate)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
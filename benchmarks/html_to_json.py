@@ -0,0 +1,55 @@
+"""
+Compare conversion of HTML to JSON through NodeElement objects and directly
+(with the standard library parser and with lxml parser backend when it's installed).
+
+Usage: python benchmarks/html_to_json.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiograph.utils import html  # noqa: E402
+
+PARAGRAPH = '<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, sed do eiusmod tempor ' \
+            '<a href="https://telegra.ph/">incididunt</a> ut labore et dolore magna aliqua.</p>' \
+            '<figure><img src="/file/6a5b15e7eb4d7329ca7af.jpg"/><figcaption>Caption</figcaption></figure>' \
+            '<ul><li>Foo</li><li>Bar</li><li>Baz</li></ul>'
+CONTENT = PARAGRAPH * (60 * 1024 // len(PARAGRAPH))
+
+
+def through_nodes():
+    return html.nodes_to_json(html.html_to_nodes(CONTENT))
+
+
+def direct():
+    return html.html_to_json(CONTENT)
+
+
+def direct_lxml():
+    return html.html_to_json(CONTENT, backend='lxml')
+
+
+def main():
+    funcs = [through_nodes, direct]
+    try:
+        html.get_parser_backend('lxml')
+    except ImportError:
+        print('lxml is not installed, lxml backend is skipped')
+    else:
+        funcs.append(direct_lxml)
+
+    expected = through_nodes()
+    assert all(func() == expected for func in funcs)
+    print(f"Content size: {len(CONTENT)} bytes")
+
+    results = {}
+    for func in funcs:
+        results[func.__name__] = min(timeit.repeat(func, number=10, repeat=5)) / 10
+        speedup = results['through_nodes'] / results[func.__name__]
+        print(f"{func.__name__:>15}: {results[func.__name__] * 1000:.2f} ms ({speedup:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare JSON codecs on page payloads: encoding of createPage request body
+and decoding of getPage response with content.
+
+Usage: python benchmarks/json_codecs.py
+"""
+import json
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiograph.utils import html  # noqa: E402
+from aiograph.utils.json_codec import JSON_CODECS, get_json_codec  # noqa: E402
+
+PARAGRAPH = '<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, sed do eiusmod tempor ' \
+            '<a href="https://telegra.ph/">incididunt</a> ut labore et dolore magna aliqua.</p>' \
+            '<p>Съешь же ещё этих мягких французских булок, да выпей чаю.</p>' \
+            '<figure><img src="/file/6a5b15e7eb4d7329ca7af.jpg"/><figcaption>Caption</figcaption></figure>' \
+            '<ul><li>Foo</li><li>Bar</li><li>Baz</li></ul>'
+CONTENT = html.html_to_json(PARAGRAPH * (60 * 1024 // len(PARAGRAPH.encode())))
+RESPONSE = json.dumps({'ok': True, 'result': {
+    'path': 'Sample-Page-12-15', 'url': 'https://telegra.ph/Sample-Page-12-15', 'title': 'Sample Page',
+    'description': '', 'views': 0, 'can_edit': True, 'content': CONTENT,
+}}).encode('utf-8')
+
+
+def legacy_encode():
+    # Previous behaviour: str from json.dumps encoded to form by aiohttp
+    return urlencode({'access_token': 'token', 'title': 'Sample Page', 'content': json.dumps(CONTENT)}).encode()
+
+
+def legacy_decode():
+    return json.loads(RESPONSE.decode('utf-8'))
+
+
+def main():
+    print(f"Content size: {len(json.dumps(CONTENT))} bytes (json.dumps)")
+    print(f"{'legacy encode':>15}: {min(timeit.repeat(legacy_encode, number=20, repeat=5)) / 20 * 1000:.3f} ms")
+    print(f"{'legacy decode':>15}: {min(timeit.repeat(legacy_decode, number=20, repeat=5)) / 20 * 1000:.3f} ms")
+
+    for name in JSON_CODECS:
+        try:
+            codec = get_json_codec(name)
+        except ImportError:
+            print(f"{name} is not installed, skipped")
+            continue
+
+        def encode():
+            return urlencode({'access_token': 'token', 'title': 'Sample Page',
+                              'content': codec.dumps(CONTENT)}).encode('ascii')
+
+        def decode():
+            return codec.loads(RESPONSE)
+
+        assert decode()['result']['content'] == CONTENT
+        encode_time = min(timeit.repeat(encode, number=20, repeat=5)) / 20
+        decode_time = min(timeit.repeat(decode, number=20, repeat=5)) / 20
+        print(f"{name + ' encode':>15}: {encode_time * 1000:.3f} ms")
+        print(f"{name + ' decode':>15}: {decode_time * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare memory usage and construction time of slotted NodeElement objects
+with equivalent objects having per-instance `__dict__`.
+
+Usage: python benchmarks/types_memory.py
+"""
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import List, Union
+
+import attr
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiograph.types import NodeElement  # noqa: E402
+from aiograph.utils import html  # noqa: E402
+
+PARAGRAPH = '<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, sed do eiusmod tempor ' \
+            '<a href="https://telegra.ph/">incididunt</a> ut labore et dolore magna aliqua.</p>' \
+            '<figure><img src="/file/6a5b15e7eb4d7329ca7af.jpg"/><figcaption>Caption</figcaption></figure>' \
+            '<ul><li>Foo</li><li>Bar</li><li>Baz</li></ul>'
+CONTENT = html.html_to_json(PARAGRAPH * 5000)
+
+
+def _convert_dict_content(value):
+    return [DictNodeElement(**item) if isinstance(item, dict) else item for item in value]
+
+
+@attr.s
+class DictNodeElement:
+    tag: str = attr.ib()
+    attrs: dict = attr.ib(factory=dict)
+    children: List[Union['DictNodeElement', str]] = attr.ib(factory=list, converter=_convert_dict_content)
+
+    @tag.validator
+    def _validate_tag(self, attribute, value):
+        if value not in html.ALLOWED_TAGS:
+            raise ValueError(f"This tag name is not allowed '{value}'!")
+
+
+def build(cls):
+    return [cls(**item) for item in CONTENT if isinstance(item, dict)]
+
+
+def measure(cls):
+    elapsed = min(timeit.repeat(lambda: build(cls), number=1, repeat=5))
+
+    tracemalloc.start()
+    nodes = build(cls)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    return size, elapsed
+
+
+def main():
+    print(f"Top-level nodes: {len(CONTENT)}")
+    results = {}
+    for cls in (DictNodeElement, NodeElement):
+        size, elapsed = results[cls.__name__] = measure(cls)
+        print(f"{cls.__name__:>16}: {size / 1024 / 1024:.2f} MiB, {elapsed * 1000:.1f} ms")
+
+    print(f"Memory: {results['NodeElement'][0] / results['DictNodeElement'][0]:.0%} of __dict__-based objects")
+
+
+if __name__ == '__main__':
+    main()
@@ -152,7 +152,8 @@ setup(
     install_requires=get_requirements(),
     tests_require=get_requirements('dev_requirements.txt'),
     extras_require={
-        'dev': get_requirements('dev_requirements.txt')
+        'dev': get_requirements('dev_requirements.txt'),
+        'lxml': ['lxml>=4.2.0'],
     },
     cmdclass={
         'test': PyTest,
@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -5,14 +6,35 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from aiograph import Telegraph
+from aiograph import Telegraph  # noqa: E402
+from aiograph.testing import FakeTelegraph  # noqa: E402
+
+# Set AIOGRAPH_LIVE_TESTS=1 to run the tests against the real Telegra.ph instead of the fake server
+LIVE_TESTS = os.environ.get('AIOGRAPH_LIVE_TESTS', '').lower() in ('1', 'true', 'yes')
 
 access_token = None
 
+# Accounts and pages are kept between the tests like on the real service
+fake_server = FakeTelegraph(seed=0)
+
+
+@pytest.yield_fixture()
+@pytest.mark.asyncio
+async def server():
+    if LIVE_TESTS:
+        yield None
+        return
+
+    async with fake_server:
+        yield fake_server
+
 
 @pytest.yield_fixture()
 @pytest.mark.asyncio
-async def telegraph():
-    aiograph = Telegraph(token=access_token)
+async def telegraph(server):
+    if server is None:
+        aiograph = Telegraph(token=access_token)
+    else:
+        aiograph = server.telegraph(token=access_token)
     yield aiograph
     await aiograph.close()
@@ -5,10 +5,12 @@ import pytest
 import conftest
 from aiograph import Telegraph, types
 from aiograph.api import SERVICE_URL
+from aiograph.testing import FakeTelegraph
 from aiograph.utils import exceptions
 
 IMAGE_PATH = Path(__file__).parent / 'telegraph.jpg'
 IMAGE_URL = 'https://www.python.org/static/img/python-logo.png'
+HTML_URL = 'http://example.com/'
 
 SHORT_NAME = 'aiograph_test'
 AUTHOR_NAME = 'AIOGraph Wrapper'
@@ -34,6 +36,20 @@ content = '<p>Page created by <a href="https://github.com/aiogram/aiograph" targ
           '<p><h4 id="FooBar">FooBar</h4><ul><li>Foo</li><li>Bar</li><li>Baz</li></ul></p>'
 
 
+@pytest.fixture()
+def image_url(server: FakeTelegraph):
+    if server is None:
+        return IMAGE_URL
+    return server.make_url(server.add_file(IMAGE_PATH.read_bytes()))
+
+
+@pytest.fixture()
+def html_url(server: FakeTelegraph):
+    if server is None:
+        return HTML_URL
+    return server.make_url('/')
+
+
 def test_service_url(telegraph: Telegraph):
     assert telegraph.service == SERVICE_URL
     assert telegraph.service_url == f"https://{SERVICE_URL}"
@@ -93,6 +109,8 @@ async def test_revoke_access_token(telegraph: Telegraph):
 
     assert account.access_token != conftest.access_token
     assert account.access_token == telegraph.token
+    with pytest.raises(exceptions.AccessTokenInvalid):
+        await telegraph.get_account_info(access_token=conftest.access_token)
 
     conftest.access_token = account.access_token
 
@@ -133,18 +151,18 @@ async def test_upload(telegraph: Telegraph):
 
 
 @pytest.mark.asyncio
-async def test_upload_from_url(telegraph: Telegraph):
-    photo = await telegraph.upload_from_url(IMAGE_URL)
+async def test_upload_from_url(telegraph: Telegraph, image_url: str, html_url: str):
+    photo = await telegraph.upload_from_url(image_url)
 
     assert photo
     assert isinstance(photo, str)
     assert telegraph.service in photo
 
-    photo = await telegraph.upload_from_url(IMAGE_URL, full=False)
+    photo = await telegraph.upload_from_url(image_url, full=False)
     assert telegraph.service not in photo
 
     with pytest.raises(exceptions.NoFilesPassed):
-        await telegraph.upload_from_url("http://example.com/")
+        await telegraph.upload_from_url(html_url)
 
 
 @pytest.mark.asyncio
@@ -202,11 +220,12 @@ async def test_get_page(telegraph: Telegraph):
 
 
 @pytest.mark.asyncio
-async def test_get_views(telegraph: Telegraph):
+async def test_get_views(server: FakeTelegraph, telegraph: Telegraph):
     page = (await telegraph.get_page_list(limit=1)).pages[0]
+    url = page.url if server is None else server.resolve_url(page.url)
 
     async with aiohttp.ClientSession() as sess:
-        async with sess.get(page.url) as resp:
+        async with sess.get(url) as resp:
             await resp.text()
 
     views = await telegraph.get_views(page.path)
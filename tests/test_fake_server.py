@@ -0,0 +1,183 @@
+"""
+Tests of the fake Telegra.ph: error injection, retries, views and caching (the API flow is covered by test_aiograph).
+"""
+import asyncio
+import datetime
+import time
+from pathlib import Path
+
+import pytest
+
+from aiograph import Telegraph
+from aiograph.testing import FakeTelegraph
+from aiograph.utils import exceptions
+from aiograph.utils.cache import ResponseCache
+from aiograph.utils.retry import RetryPolicy
+
+IMAGE_PATH = Path(__file__).parent / 'telegraph.jpg'
+
+
+@pytest.yield_fixture()
+@pytest.mark.asyncio
+async def server():
+    async with FakeTelegraph(seed=42) as fake:
+        yield fake
+
+
+@pytest.yield_fixture()
+@pytest.mark.asyncio
+async def telegraph(server: FakeTelegraph):
+    client = server.telegraph()
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_pages(server: FakeTelegraph, telegraph: Telegraph):
+    await telegraph.create_account('test', 'Author')
+
+    page = await telegraph.create_page('Test page', '<p>Hello, <b>world</b>!</p>')
+    assert page.path.startswith('Test-page-')
+    assert page.url == f"https://telegra.ph/{page.path}"
+    assert server.resolve_url(page.url) == server.make_url(f"/{page.path}")
+    assert (await telegraph.create_page('Test page', 'Text')).path == page.path + '-2'
+
+    pages = await telegraph.get_page_list(limit=1)
+    assert pages.total_count == 2
+    assert pages.pages[0].path == page.path + '-2'
+    assert [page.path async for page in telegraph.iter_pages()] == [page.path + '-2', page.path]
+
+    server.add_views(page.path, 3, when=datetime.datetime(2020, 5, 1, 10))
+    server.add_views(page.path, 2, when=datetime.datetime(2020, 5, 2, 10))
+    assert (await telegraph.get_page(page.path)).views == 5
+    assert await telegraph.get_views(page.path, year=2020, month=5, day=1) == 3
+
+    with pytest.raises(exceptions.PageNotFound):
+        await telegraph.get_page('Unknown-01-01')
+    with pytest.raises(exceptions.ContentTextRequired):
+        await telegraph.create_page('Empty', '<img src="/file/1.jpg"/>')
+
+    telegraph.max_content_size = None
+    with pytest.raises(exceptions.ContentTooBig):
+        await telegraph.create_page('Big', 'x' * 70000)
+
+    other = await telegraph.create_account('other', auth=False)
+    with pytest.raises(exceptions.TelegraphError, match='PAGE_ACCESS_DENIED'):
+        await telegraph.edit_page(page.path, 'Title', 'content', access_token=other.access_token)
+
+
+@pytest.mark.asyncio
+async def test_author_refresh_with_response_cache(server: FakeTelegraph):
+    async with server.telegraph(response_cache=ResponseCache()) as telegraph:
+        account = await telegraph.create_account('test', 'Old')
+        assert (await telegraph.get_author()).author_name == 'Old'
+
+        # Changed outside of the client
+        server.accounts[account.access_token]['author_name'] = 'New'
+        assert (await telegraph.get_author()).author_name == 'Old'
+        assert (await telegraph.get_author(refresh=True)).author_name == 'New'
+        assert server.calls['getAccountInfo'] == 2
+
+        # Fresh response replaces the cached one
+        account = await telegraph.get_account_info('author_name', 'author_url')
+        assert account.author_name == 'New'
+        assert server.calls['getAccountInfo'] == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_page_with_response_cache(server: FakeTelegraph):
+    async with server.telegraph(response_cache=ResponseCache()) as telegraph:
+        await telegraph.create_account('test')
+        page = await telegraph.create_page('Title', '<p>Text</p>')
+        await telegraph.get_page(page.path, return_content=True)
+
+        # Changed outside of the client while the response is cached
+        server.pages[page.path]['content'] = [{'tag': 'p', 'children': ['Other']}]
+        await telegraph.sync_page(page.path, 'Title', '<p>Text</p>')
+
+        assert server.calls['editPage'] == 1
+        assert (await telegraph.get_page(page.path, return_content=True)).html_content == '<p>Text</p>'
+
+
+@pytest.mark.asyncio
+async def test_upload(server: FakeTelegraph, telegraph: Telegraph):
+    src = await telegraph.upload(IMAGE_PATH, full=False)
+    assert src[0].startswith('/file/') and src[0].endswith('.jpg')
+    assert server.files[src[0][len('/file/'):]][0] == IMAGE_PATH.read_bytes()
+    assert server.add_file(IMAGE_PATH.read_bytes()) == src[0]
+
+    with pytest.raises(exceptions.NoFilesPassed):
+        await telegraph.upload(('text.txt', b'text'))
+
+    server.fail_next('upload')
+    with pytest.raises(exceptions.ServerError):
+        await telegraph.upload(IMAGE_PATH)
+
+    server.fail_next('upload', status=502)
+    first, second = await telegraph.upload_many(IMAGE_PATH, IMAGE_PATH, concurrency=1, full=False)
+    assert isinstance(first.error, exceptions.ServerError)
+    assert second.result == src[0]
+
+
+@pytest.mark.asyncio
+async def test_retries(server: FakeTelegraph):
+    telegraph = server.telegraph(retry_policy=RetryPolicy(backoff=0.01, jitter=False))
+    try:
+        await telegraph.create_account('test')
+
+        server.fail_next('getAccountInfo', count=2)
+        assert (await telegraph.get_account_info()).short_name == 'test'
+        assert server.calls['getAccountInfo'] == 3
+
+        server.flood_next('createPage', retry_after=0)
+        await telegraph.create_page('Title', 'content')
+        assert server.calls['createPage'] == 2
+
+        # Result of non-idempotent request is unknown
+        server.fail_next('createPage')
+        with pytest.raises(exceptions.ServerError):
+            await telegraph.create_page('Title', 'content')
+
+        server.fail_next(count=5)
+        with pytest.raises(exceptions.ServerError):
+            await telegraph.get_page_list()
+        assert server.calls['getPageList'] == 5
+    finally:
+        await telegraph.close()
+
+
+@pytest.mark.asyncio
+async def test_latency():
+    async with FakeTelegraph(latency=0.05) as server:
+        telegraph = server.telegraph()
+        try:
+            await telegraph.create_account('test')
+
+            start = time.monotonic()
+            results = [item async for item in telegraph.create_pages(
+                [{'title': f"Page {i}", 'content': 'content'} for i in range(20)], concurrency=10)]
+            elapsed = time.monotonic() - start
+        finally:
+            await telegraph.close()
+
+    assert all(item.ok for item in results)
+    assert len(server.pages) == 20
+    # Two waves of requests instead of twenty sequential ones
+    assert elapsed < 0.05 * 20 / 2
+
+
+@pytest.mark.asyncio
+async def test_random_errors():
+    async with FakeTelegraph(seed=1) as server:
+        telegraph = server.telegraph(retry_policy=RetryPolicy(max_attempts=10, backoff=0.001, jitter=False))
+        try:
+            await telegraph.create_account('test')
+            page = await telegraph.create_page('Title', 'content')
+
+            server.error_rate = 0.3
+            pages = await asyncio.gather(*(telegraph.get_page(page.path) for _ in range(20)))
+        finally:
+            await telegraph.close()
+
+    assert all(item.path == page.path for item in pages)
+    assert server.calls['getPage'] > 20
@@ -1,9 +1,49 @@
+import asyncio
+import datetime
+import io
+import mmap
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import aiohttp
 import pytest
-from aiohttp import BasicAuth
+from aiohttp import BasicAuth, web
+from aiohttp.test_utils import TestServer
 from aiohttp_socks import SocksConnector, SocksVer
 
-from aiograph import Telegraph, types
-from aiograph.utils import exceptions
+from aiograph import Telegraph, TelegraphPool, types
+from aiograph.api import Methods, get_ssl_context
+from aiograph.utils import exceptions, files, upload_cache
+from aiograph.utils.cache import LRUCache, ResponseCache
+from aiograph.utils.batch import ORDERED_WINDOW_FACTOR, run_batch
+from aiograph.utils.content import split_content
+from aiograph.utils.json_codec import CustomJsonCodec, StdlibJsonCodec, get_json_codec
+from aiograph.utils.rate_limit import RateLimiter
+from aiograph.utils.retry import RetryPolicy
+from aiograph.utils.singleflight import SingleFlight
+from aiograph.utils.upload_cache import MemoryUploadCache, SQLiteUploadCache
+from aiograph.utils.views import iter_buckets
+
+IMAGE_PATH = Path(__file__).parent / 'telegraph.jpg'
+PACKAGE_DIR = Path(__file__).parent.parent
+
+# Cumulative import time of modules in microseconds (regression budget with a large margin)
+IMPORT_TIME_BUDGET = {
+    'aiograph': 20_000,
+    'aiograph.utils.html': 150_000,
+}
+
+
+@pytest.yield_fixture()
+@pytest.mark.asyncio
+async def telegraph():
+    # Tests of this module mock the service themselves, so client sends requests over HTTP
+    client = Telegraph()
+    yield client
+    await client.close()
 
 
 def test_prepare_content():
@@ -14,10 +54,94 @@ def test_prepare_content():
         telegraph._prepare_content(42)
 
     content = telegraph._prepare_content('content')
-    assert isinstance(content, str)
+    assert isinstance(content, (str, bytes))
 
     content = telegraph._prepare_content(['content'])
-    assert isinstance(content, str)
+    assert telegraph._json_deserialize(content) == ['content']
+
+    with pytest.raises(exceptions.ContentTooBig) as exc_info:
+        telegraph._prepare_content(['я' * 40000])
+    assert exc_info.value.max_size == 64 * 1024
+    assert exc_info.value.size > exc_info.value.max_size
+
+    telegraph.max_content_size = None
+    telegraph._prepare_content(['я' * 40000])
+
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+def test_json_codecs(name):
+    try:
+        codec = get_json_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+    data = [{'tag': 'p', 'children': ['Привет', {'tag': 'b', 'children': ['"<>&']}]}, 'text']
+    assert codec.loads(codec.dumps(data)) == data
+    assert codec.loads(codec.dumps_str(data).encode('utf-8')) == data
+    assert get_json_codec(name) is codec
+
+
+def test_json_codec_selection():
+    assert get_json_codec(None) is get_json_codec('auto')
+    codec = StdlibJsonCodec()
+    assert get_json_codec(codec) is codec
+    with pytest.raises(ValueError):
+        get_json_codec('unknown')
+
+    telegraph = Telegraph(json_codec='json')
+    assert telegraph._prepare_content('<p>Текст</p>') == '[{"tag":"p","children":["Текст"]}]'
+
+    telegraph = Telegraph(json_serialize=lambda obj: 'serialized')
+    assert isinstance(telegraph.json_codec, CustomJsonCodec)
+    assert telegraph._prepare_content('content') == 'serialized'
+    assert telegraph._json_deserialize(b'["content"]') == ['content']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('codec', ['json', 'orjson'])
+async def test_request_form_encoding(codec):
+    received = {}
+
+    async def handler(request):
+        received['content_type'] = request.content_type
+        received['form'] = dict(await request.post())
+        return web.json_response({'ok': True, 'result': {'path': 'Test-01-01', 'title': 'Заголовок'}})
+
+    app = web.Application()
+    app.router.add_post('/createPage', handler)
+    async with TestServer(app) as server:
+        telegraph = Telegraph(token='token', json_codec=codec)
+        telegraph._api_url = str(server.make_url('/'))
+        try:
+            page = await telegraph.create_page('Заголовок', '<p>Текст &amp; текст</p>', return_content=True)
+        finally:
+            await telegraph.close()
+
+    assert page.title == 'Заголовок'
+    assert received['content_type'] == 'application/x-www-form-urlencoded'
+    assert received['form']['title'] == 'Заголовок'
+    assert received['form']['access_token'] == 'token'
+    assert telegraph._json_deserialize(received['form']['content']) == [{'tag': 'p', 'children': ['Текст & текст']}]
+
+
+def test_content_too_big_detection():
+    with pytest.raises(exceptions.ContentTooBig):
+        exceptions.TelegraphError.detect('CONTENT_TOO_BIG')
+
+
+def test_split_content():
+    import json
+
+    nodes = [{'tag': 'p', 'children': ['x' * 100]}] * 50
+    parts = split_content(nodes, json.dumps, max_size=1024, reserve=100)
+
+    assert sum(parts, []) == nodes
+    assert all(len(json.dumps(part)) <= 1024 - 100 for part in parts)
+    assert len(json.dumps(parts[0] + nodes[:1])) > 1024 - 100
+
+    assert split_content([], json.dumps) == [[]]
+    with pytest.raises(exceptions.ContentTooBig):
+        split_content(['x' * 2000], json.dumps, max_size=1024)
 
 
 def test_token_property(telegraph: Telegraph):
@@ -90,7 +214,29 @@ def test_context_token(telegraph: Telegraph):
     assert telegraph.token == 'baz'
 
 
-def test_socks5_proxy():
+@pytest.mark.asyncio
+async def test_http_proxy_changed():
+    proxied = []
+
+    async def handler(request):
+        proxied.append((request.url.host, request.headers.get('Proxy-Authorization')))
+        return web.json_response({'ok': True, 'result': {'short_name': 'test'}})
+
+    app = web.Application()
+    app.router.add_post('/getAccountInfo', handler)
+    async with TestServer(app) as server:
+        async with Telegraph(token='token') as telegraph:
+            telegraph._api_url = 'http://api.telegraph.test/'
+            # Proxy settings are applied to the next requests
+            telegraph.proxy = str(server.make_url('/'))
+            telegraph.proxy_auth = BasicAuth('username', 'password')
+            assert (await telegraph.get_account_info()).short_name == 'test'
+
+    assert proxied == [('api.telegraph.test', BasicAuth('username', 'password').encode())]
+
+
+@pytest.mark.asyncio
+async def test_socks5_proxy():
     telegraph = Telegraph(proxy='socks5://example.com:1050', proxy_auth=BasicAuth('username', 'password'))
     connector = telegraph.session._connector
 
@@ -100,3 +246,844 @@ def test_socks5_proxy():
     assert connector._socks_port == 1050
     assert connector._socks_username == 'username'
     assert connector._socks_password == 'password'
+
+
+@pytest.mark.asyncio
+async def test_create_pages_batch(telegraph: Telegraph, monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request(method, *, path=None, payload=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01 if payload['title'] != 'Page 0' else 0.05)
+        in_flight -= 1
+        if payload['title'] == 'Page 3':
+            raise exceptions.TelegraphError('TITLE_TOO_LONG')
+        return {'path': payload['title'].replace(' ', '-'), 'title': payload['title']}
+
+    monkeypatch.setattr(telegraph, 'request', request)
+
+    async def specs():
+        for i in range(10):
+            yield {'title': f"Page {i}", 'content': 'content'}
+
+    results = [item async for item in telegraph.create_pages(specs(), concurrency=3, ordered=True)]
+
+    assert max_in_flight == 3
+    assert [item.index for item in results] == list(range(10))
+    assert [item.ok for item in results].count(False) == 1
+    assert isinstance(results[3].error, exceptions.TelegraphError)
+    assert results[0].unwrap().path == 'Page-0'
+
+    results = [item async for item in telegraph.create_pages([{'title': 'Page 0', 'content': 'content'},
+                                                              {'title': 'Page 1', 'content': 'content'}])]
+    assert [item.index for item in results] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_ordered_window():
+    started = []
+
+    async def call(index):
+        started.append(index)
+        await asyncio.sleep(0.2 if index == 0 else 0.001)
+        return index
+
+    results = run_batch(call, range(1000), concurrency=3, ordered=True)
+    first = await results.__anext__()
+    assert first.result == 0
+    # Slow head item doesn't let the rest of the batch run ahead
+    assert len(started) <= 3 * ORDERED_WINDOW_FACTOR
+    assert [item.result async for item in results] == list(range(1, 1000))
+
+
+@pytest.mark.asyncio
+async def test_create_page_chain(telegraph: Telegraph, monkeypatch):
+    requests = []
+
+    async def request(method, *, path=None, payload=None):
+        requests.append((method, path))
+        content = telegraph._json_deserialize(payload['content'])
+        assert len(payload['content']) <= 64 * 1024
+        if method == 'createPage':
+            await asyncio.sleep(0.01 * (len(requests) % 3))
+            path = f"Chain-{content[0]['children'][0]}"
+        return {'path': path, 'url': f"https://telegra.ph/{path}", 'title': payload['title'],
+                'content': content}
+
+    monkeypatch.setattr(telegraph, 'request', request)
+
+    content = [{'tag': 'p', 'children': [f"{i:03}", 'x' * 1000]} for i in range(200)]
+    pages = await telegraph.create_page_chain('Chain', content, next_text='Next')
+
+    assert len(pages) == 4
+    assert [method for method, _ in requests].count('editPage') == 3
+    assert sum((page.raw_content[:-1] for page in pages[:-1]), []) + pages[-1].raw_content == content
+    for page, next_page in zip(pages, pages[1:]):
+        link = page.content[-1].children[0]
+        assert link.attrs['href'] == next_page.url
+        assert link.children == ['Next']
+
+
+@pytest.mark.asyncio
+async def test_sync_page(telegraph: Telegraph, monkeypatch):
+    stored = {'Page-01-01': {'path': 'Page-01-01', 'title': 'Title', 'author_name': 'Author',
+                             'content': [{'tag': 'p', 'children': ['Text']}]}}
+    calls = []
+
+    async def request(method, *, path=None, payload=None, refresh=False):
+        calls.append(method)
+        if method == 'getPage':
+            return stored[path]
+        if method == 'getAccountInfo':
+            return {'author_name': 'Author'}
+        stored[path] = {'path': path, 'title': payload['title'], 'author_name': payload.get('author_name'),
+                        'content': telegraph._json_deserialize(payload['content'])}
+        return stored[path]
+
+    monkeypatch.setattr(telegraph, 'request', request)
+
+    # Fetched state is the same
+    page = await telegraph.sync_page('Page-01-01', 'Title', '<p>Text</p>', as_user=True)
+    assert calls == ['getAccountInfo', 'getPage']
+    assert telegraph.skipped_writes == 1
+    assert page.url == 'https://telegra.ph/Page-01-01'
+
+    # Known state is the same
+    await telegraph.sync_page('Page-01-01', 'Title', '<p>Text</p>', author_name='Author')
+    assert calls == ['getAccountInfo', 'getPage']
+    assert telegraph.skipped_writes == 2
+
+    # Changed
+    await telegraph.sync_page('Page-01-01', 'Title', '<p>New text</p>', author_name='Author')
+    assert calls[-1] == 'editPage'
+    await telegraph.sync_page('Page-01-01', 'Title', '<p>New text</p>', author_name='Author')
+    assert calls.count('editPage') == 1
+    await telegraph.sync_page('Page-01-01', 'Title', '<p>New text</p>')
+    assert calls.count('editPage') == 2
+
+    # Page is edited outside of sync_page
+    await telegraph.edit_page('Page-01-01', 'Title', '<p>Other text</p>')
+    results = [item.unwrap() async for item in telegraph.sync_pages(
+        [{'path': 'Page-01-01', 'title': 'Title', 'content': '<p>New text</p>', 'fetch': False}] * 2)]
+    assert len(results) == 2
+    assert calls.count('editPage') == 4
+    assert telegraph.skipped_writes == 4
+
+
+def test_with_token_reset_on_error(telegraph: Telegraph):
+    telegraph.token = 'original'
+    with pytest.raises(RuntimeError):
+        with telegraph.with_token('foo'):
+            raise RuntimeError()
+    assert telegraph.token == 'original'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('strategy', ['round_robin', 'least_loaded'])
+async def test_telegraph_pool(monkeypatch, strategy):
+    pool = TelegraphPool({'first': 'token-1', 'second': 'token-2', 'third': 'token-3'}, strategy=strategy)
+    telegraph = pool.telegraph
+    tokens = []
+
+    async def send_request(method, *, path=None, payload=None):
+        tokens.append(payload['access_token'])
+        await asyncio.sleep(0.01 if payload['access_token'] != 'token-1' else 0.05)
+        if payload.get('title') == 'Bad':
+            raise exceptions.TelegraphError('TITLE_REQUIRED')
+        if method == Methods.REVOKE_ACCESS_TOKEN:
+            return {'access_token': 'token-4'}
+        if method == Methods.GET_PAGE_LIST:
+            return {'total_count': 0, 'pages': []}
+        return {'path': payload.get('title'), 'title': payload.get('title')}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+
+    try:
+        results = [item async for item in pool.create_pages(
+            [{'title': f"Page {i}", 'content': 'content'} for i in range(9)], concurrency=6)]
+        assert all(item.ok for item in results)
+        counts = {key: value['calls'] for key, value in pool.stats().items()}
+        if strategy == 'round_robin':
+            assert counts == {'first': 3, 'second': 3, 'third': 3}
+        else:
+            # Slow account gets less pages
+            assert counts['first'] < counts['second']
+        assert sorted(set(tokens)) == ['token-1', 'token-2', 'token-3']
+
+        tokens.clear()
+        with pytest.raises(exceptions.TelegraphError):
+            await pool.account('second').create_page('Bad', 'content')
+        await pool.account('second').get_page_list()
+        assert tokens == ['token-2', 'token-2']
+        assert pool.stats()['second']['errors'] == 1
+        assert all(value['in_flight'] == 0 for value in pool.stats().values())
+        assert telegraph.token is None
+
+        account = await pool.account('third').revoke_access_token()
+        assert account.access_token == pool.account('third').token == 'token-4'
+        assert telegraph.token is None
+
+        with pytest.raises(AttributeError):
+            pool.account('first').create_pages
+        with pytest.raises(KeyError):
+            pool.account('unknown')
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_settings():
+    telegraph = Telegraph(connections_limit=50, limit_per_host=20, keepalive_timeout=30, ttl_dns_cache=300,
+                          timeout=aiohttp.ClientTimeout(total=60, connect=5, sock_read=10))
+    connector = telegraph.session.connector
+    assert connector.limit == 50
+    assert connector.limit_per_host == 20
+    assert connector._keepalive_timeout == 30
+    assert connector._cached_hosts._ttl == 300
+    assert telegraph.session.timeout.connect == 5
+    assert telegraph.session.timeout.sock_read == 10
+    short = Telegraph(timeout=30)
+    assert short.session.timeout.total == 30
+    await short.close()
+
+    other = Telegraph()
+    assert other.session.connector._ssl is connector._ssl is get_ssl_context()
+    await telegraph.close()
+    await other.close()
+    assert connector.closed
+
+
+@pytest.mark.asyncio
+async def test_shared_connector_and_session():
+    connector = aiohttp.TCPConnector()
+    first, second = Telegraph(connector=connector), Telegraph(connector=connector)
+    assert first.session.connector is second.session.connector is connector
+    await first.close()
+    await second.close()
+    assert not connector.closed
+
+    session = aiohttp.ClientSession(connector=connector)
+    telegraph = Telegraph(session=session)
+    assert telegraph.session is session
+    await telegraph.close()
+    assert not session.closed
+    await session.close()
+    assert connector.closed
+
+    with pytest.raises(ValueError):
+        Telegraph(connector=connector, session=session)
+    with pytest.raises(ValueError):
+        Telegraph(connector=connector, proxy='socks5://example.com:1050')
+
+
+def test_lazy_session():
+    # Client can be created outside of event loop
+    telegraph = Telegraph()
+    assert telegraph._session is None
+
+    async def main():
+        async with telegraph as client:
+            assert client is telegraph
+            session = telegraph.session
+            assert telegraph.session is session
+        assert session.closed
+        assert telegraph._session is None
+
+    asyncio.run(main())
+
+
+@pytest.mark.asyncio
+async def test_session_after_fork(monkeypatch):
+    telegraph = Telegraph()
+    session = telegraph.session
+
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    assert telegraph.session is not session
+    assert not session.closed
+
+    await telegraph.close()
+    await session.close()
+
+
+def _run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args, '-c', code], cwd=str(PACKAGE_DIR),
+                          capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_TIME_BUDGET))
+def test_import_time(module):
+    result = _run_python(f"import {module}", '-X', 'importtime')
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    assert 'aiohttp' not in times
+    assert times[module] < IMPORT_TIME_BUDGET[module]
+
+
+def test_lazy_imports():
+    result = _run_python('import sys\n'
+                         'import aiograph\n'
+                         'from aiograph.utils import html\n'
+                         'html.html_to_json("<p>Text</p>")\n'
+                         'assert "aiograph.api" not in sys.modules\n'
+                         'telegraph = aiograph.Telegraph()\n'
+                         'print(sorted(name for name in ("aiohttp", "certifi", "attr") if name in sys.modules))')
+    assert 'aiohttp' not in result.stdout
+
+    import aiograph
+    assert aiograph.Telegraph is Telegraph
+    assert aiograph.exceptions is exceptions
+    assert 'TelegraphPool' in dir(aiograph)
+    with pytest.raises(AttributeError):
+        aiograph.unknown
+
+
+def test_flood_wait_detection():
+    with pytest.raises(exceptions.FloodWait) as exc_info:
+        exceptions.TelegraphError.detect('FLOOD_WAIT_7')
+
+    assert exc_info.value.retry_after == 7
+
+
+def test_retry_policy():
+    policy = RetryPolicy(max_attempts=3, backoff=1, jitter=False, max_flood_wait=10)
+
+    assert policy.get_delay('getPage', 1, exceptions.ServerError(502)) == 1
+    assert policy.get_delay('getPage', 2, asyncio.TimeoutError()) == 2
+    assert policy.get_delay('getPage', 3, asyncio.TimeoutError()) is None
+    assert policy.get_delay('getPage', 1, exceptions.PageNotFound('Page not found!')) is None
+
+    # Result of the non-idempotent request is unknown
+    assert policy.get_delay('createPage', 1, exceptions.ServerError(502)) is None
+    assert policy.get_delay('createPage', 1, asyncio.TimeoutError()) is None
+    # Request is rejected by the server
+    assert policy.get_delay('createPage', 1, exceptions.FloodWait('', retry_after=5)) == 6
+    assert policy.get_delay('createPage', 1, exceptions.FloodWait('', retry_after=20)) is None
+
+
+@pytest.mark.asyncio
+async def test_request_retry(telegraph: Telegraph, monkeypatch):
+    attempts = []
+
+    async def send_request(method, *, path=None, payload=None):
+        attempts.append(method)
+        if len(attempts) < 3:
+            raise exceptions.FloodWait('', retry_after=0)
+        return {'views': 42}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+
+    with pytest.raises(exceptions.FloodWait):
+        await telegraph.get_views('path')
+    assert len(attempts) == 1
+
+    attempts.clear()
+    telegraph.retry_policy = RetryPolicy(backoff=0)
+    assert await telegraph.get_views('path') == 42
+    assert len(attempts) == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter(telegraph: Telegraph, monkeypatch):
+    sent = []
+
+    async def send_request(method, *, path=None, payload=None):
+        sent.append((payload['access_token'], asyncio.get_event_loop().time()))
+        return {'total_count': 0, 'pages': []}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+    telegraph.rate_limiter = RateLimiter(rate=20, capacity=1)
+
+    started = asyncio.get_event_loop().time()
+    await asyncio.gather(*(telegraph.get_page_list(access_token='foo') for _ in range(3)),
+                         *(telegraph.get_page_list(access_token='bar') for _ in range(3)))
+
+    for token in ('foo', 'bar'):
+        times = [t for key, t in sent if key == token]
+        assert len(times) == 3
+        assert times[-1] - started >= 0.09
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+    cache.set('d', 4, ttl=-1)
+    assert cache.get('d') is None
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'evictions': 2, 'size': 1}
+
+    cache.set('e', 5, ttl=-1)
+    assert cache.pop('e', 'default') == 'default'
+    assert 'e' not in cache
+    assert cache.pop('c') == 3
+
+
+@pytest.mark.asyncio
+async def test_response_cache(telegraph: Telegraph, monkeypatch):
+    sent = []
+
+    async def send_request(method, *, path=None, payload=None):
+        sent.append(method)
+        return {'path': path, 'title': 'Title', 'content': [{'tag': 'p', 'children': ['Text']}]}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+    telegraph.response_cache = ResponseCache(maxsize=10)
+
+    page = await telegraph.get_page('Page-01-01', return_content=True)
+    page.content[0].add('Changed')
+    page = await telegraph.get_page('Page-01-01', return_content=True)
+    assert page.content[0].children == ['Text']
+    await telegraph.get_page('Page-01-01')
+    assert sent == ['getPage', 'getPage']
+    assert telegraph.response_cache.stats()['hits'] == 1
+
+    await telegraph.edit_page('Page-01-01', 'Title', 'content')
+    await telegraph.get_page('Page-01-01', return_content=True)
+    assert sent == ['getPage', 'getPage', 'editPage', 'getPage']
+
+
+@pytest.mark.asyncio
+async def test_author_cache(telegraph: Telegraph, monkeypatch):
+    sent = []
+
+    async def send_request(method, *, path=None, payload=None):
+        sent.append((method, payload))
+        if method == 'getAccountInfo':
+            return {'author_name': 'Author', 'author_url': 'https://t.me/author'}
+        if method == 'editAccountInfo':
+            return {'short_name': 'test', 'author_name': payload['author_name'], 'author_url': ''}
+        return {'path': 'Title-01-01', 'title': payload['title'], 'author_name': payload.get('author_name')}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+    telegraph.token = 'foo'
+
+    await telegraph.create_page('Title', 'content', as_user=True)
+    page = await telegraph.create_page('Title', 'content', as_user=True)
+    assert page.author_name == 'Author'
+    assert [method for method, _ in sent] == ['getAccountInfo', 'createPage', 'createPage']
+
+    await telegraph.edit_account_info(author_name='New author')
+    page = await telegraph.create_page('Title', 'content', as_user=True)
+    assert page.author_name == 'New author'
+    assert sent[-1][1]['author_name'] == 'New author'
+
+    sent.clear()
+    await telegraph.get_author(refresh=True)
+    await telegraph.get_author(access_token='bar')
+    assert [payload['access_token'] for _, payload in sent] == ['foo', 'bar']
+
+
+@pytest.mark.asyncio
+async def test_coalesce_requests(telegraph: Telegraph, monkeypatch):
+    sent = []
+
+    async def send_request(method, *, path=None, payload=None):
+        sent.append(method)
+        await asyncio.sleep(0.01)
+        return {'views': 42}
+
+    monkeypatch.setattr(telegraph, '_send_request', send_request)
+    telegraph.single_flight = SingleFlight()
+
+    results = await asyncio.gather(*(telegraph.get_views('Page-01-01') for _ in range(10)),
+                                   telegraph.get_views('Page-01-01', year=2020))
+
+    assert results == [42] * 11
+    assert len(sent) == 2
+    assert telegraph.single_flight.collapsed == 9
+    assert telegraph.single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_pages(telegraph: Telegraph, monkeypatch):
+    requested = []
+
+    async def get_page_list(offset=None, limit=None, access_token=None):
+        requested.append((offset, limit))
+        paths = [f"Page-{i}" for i in range(offset, min(offset + limit, 450))]
+        return types.PageList(total_count=450, pages=[{'path': path} for path in paths])
+
+    monkeypatch.setattr(telegraph, 'get_page_list', get_page_list)
+
+    pages = [page async for page in telegraph.iter_pages()]
+    assert [page.path for page in pages] == [f"Page-{i}" for i in range(450)]
+    assert requested == [(0, 200), (200, 200), (400, 50)]
+
+    for prefetch in (0, 3):
+        requested.clear()
+        pages = [page async for page in telegraph.iter_pages(offset=10, limit=25, page_size=10, prefetch=prefetch)]
+        assert [page.path for page in pages] == [f"Page-{i}" for i in range(10, 35)]
+        assert requested == [(10, 10), (20, 10), (30, 5)]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_early_exit(telegraph: Telegraph, monkeypatch):
+    finished = []
+
+    async def get_page_list(offset=None, limit=None, access_token=None):
+        try:
+            if offset == 10:
+                raise exceptions.TelegraphError('INTERNAL_ERROR')
+            if offset:
+                await asyncio.sleep(1)
+            return types.PageList(total_count=40, pages=[{'path': f"Page-{i}"} for i in range(limit)])
+        finally:
+            finished.append(offset)
+
+    monkeypatch.setattr(telegraph, 'get_page_list', get_page_list)
+
+    pages = telegraph.iter_pages(page_size=10, prefetch=3)
+    assert (await pages.__anext__()).path == 'Page-0'
+    await asyncio.sleep(0.01)
+    await pages.aclose()
+
+    # Prefetched windows are finished (failed or cancelled) when the iterator is closed
+    assert sorted(finished) == [0, 10, 20, 30]
+
+
+@pytest.mark.asyncio
+async def test_views_series(telegraph: Telegraph, monkeypatch):
+    requested = []
+
+    async def get_views(path, year=None, month=None, day=None, hour=None):
+        requested.append((path, year, month, day, hour))
+        return day
+
+    monkeypatch.setattr(telegraph, 'get_views', get_views)
+
+    today = datetime.datetime.utcnow().date()
+    start = today - datetime.timedelta(days=2)
+    first, second = await telegraph.get_views_series('foo', 'bar', start=start, end=today)
+
+    assert first.path == 'foo'
+    assert second.path == 'bar'
+    assert len(first) == 3
+    assert list(first.views) == [(start + datetime.timedelta(days=i)).day for i in range(3)]
+    assert first.dates[0].date() == start
+    assert len(requested) == 6
+
+    # Only the current day is requested again
+    requested.clear()
+    series, = await telegraph.get_views_series('foo', start=start, end=today)
+    assert series.views == first.views
+    assert requested == [('foo', today.year, today.month, today.day, None)]
+
+    with pytest.raises(ValueError):
+        await telegraph.get_views_series('foo', start=start, end=today, granularity='week')
+
+
+def test_views_buckets():
+    buckets = list(iter_buckets(datetime.date(2020, 5, 1), datetime.date(2020, 5, 2), 'hour'))
+    assert len(buckets) == 48
+    assert buckets[-1][1] == {'year': 2020, 'month': 5, 'day': 2, 'hour': 23}
+
+    end = datetime.datetime(2020, 5, 2, 5, 30)
+    assert len(list(iter_buckets(datetime.date(2020, 5, 1), end, 'hour'))) == 30
+    assert len(list(iter_buckets(datetime.date(2020, 5, 1), datetime.date(2020, 5, 2), 'day'))) == 2
+
+
+@pytest.mark.asyncio
+async def test_views_series_error(telegraph: Telegraph, monkeypatch):
+    finished = []
+
+    async def get_views(path, year=None, month=None, day=None, hour=None):
+        try:
+            if hour == 0:
+                raise exceptions.TelegraphError('INTERNAL_ERROR')
+            await asyncio.sleep(1)
+        finally:
+            finished.append(hour)
+
+    monkeypatch.setattr(telegraph, 'get_views', get_views)
+
+    with pytest.raises(exceptions.TelegraphError):
+        await telegraph.get_views_series('foo', start=datetime.date(2020, 5, 1), end=datetime.date(2020, 5, 1),
+                                         granularity='hour', concurrency=4)
+    # Other requests are cancelled, not left running
+    assert sorted(finished) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks(tmp_path):
+    data = bytes(range(256)) * 10
+    progress = []
+
+    chunks = [chunk async for chunk in files.iter_chunks(data, chunk_size=1000, filename='data',
+                                                         progress=lambda *args: progress.append(args))]
+    assert b''.join(chunks) == data
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 560]
+    assert progress[-1] == ('data', 2560, 2560)
+
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert files.get_size(file) == 2560
+        assert b''.join([chunk async for chunk in files.iter_chunks(mapped, chunk_size=1000)]) == data
+
+    class AsyncReader:
+        def __init__(self):
+            self.buffer = io.BytesIO(data)
+
+        async def read(self, size):
+            return self.buffer.read(size)
+
+    assert files.get_size(AsyncReader()) is None
+    assert b''.join([chunk async for chunk in files.iter_chunks(AsyncReader())]) == data
+
+    with pytest.raises(exceptions.FileTooLarge):
+        async for _ in files.iter_chunks(AsyncReader(), chunk_size=1000, max_size=2000):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_upload_size_limit(telegraph: Telegraph, monkeypatch):
+    def post(*args, **kwargs):
+        raise AssertionError('Request must not be sent')
+
+    monkeypatch.setattr(telegraph.session, 'post', post)
+
+    with pytest.raises(exceptions.FileTooLarge):
+        await telegraph.upload(('image.jpg', io.BytesIO(b'0' * 1024)), max_size=1000)
+    with pytest.raises(exceptions.FileTooLarge):
+        await telegraph.upload(IMAGE_PATH, stream=True, max_size=1000)
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_size_limit(telegraph: Telegraph, monkeypatch):
+    async def handle_upload(request):
+        await request.read()
+        return web.json_response([{'src': '/file/1.jpg'}])
+
+    app = web.Application(client_max_size=10 * 1024 * 1024)
+    app.router.add_post('/upload', handle_upload)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(telegraph, 'format_service_url', lambda path: str(server.make_url(path)))
+
+    data = b'\xff\xd8\xff' + b'0' * 300000
+    threads = set()
+
+    class AsyncReader:
+        def __init__(self):
+            self.buffer = io.BytesIO(data)
+
+        async def read(self, size):
+            return self.buffer.read(size)
+
+    class SyncReader:
+        # File of unknown size (like a pipe)
+        def __init__(self):
+            self.buffer = io.BytesIO(data)
+
+        def read(self, size):
+            threads.add(threading.get_ident())
+            return self.buffer.read(size)
+
+    try:
+        for reader in (AsyncReader(), SyncReader()):
+            with pytest.raises(exceptions.FileTooLarge):
+                await telegraph.upload(('image.jpg', reader), stream=True, max_size=200000)
+
+        assert await telegraph.upload(('image.jpg', SyncReader()), stream=True, full=False) == ['/file/1.jpg']
+        assert threading.get_ident() not in threads
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_many(telegraph: Telegraph, monkeypatch):
+    groups = []
+
+    async def upload_files(files, **kwargs):
+        groups.append(files)
+        if 'bad.jpg' in files:
+            raise exceptions.NoFilesPassed()
+        return [{'src': f"/file/{file}"} for file in files]
+
+    monkeypatch.setattr(telegraph, '_upload_files', upload_files)
+
+    results = await telegraph.upload_many('1.jpg', '2.jpg', 'bad.jpg', '4.jpg', '5.jpg', per_request=2, full=False)
+
+    assert sorted(groups) == [('1.jpg', '2.jpg'), ('5.jpg',), ('bad.jpg', '4.jpg')]
+    assert [item.index for item in results] == [0, 1, 2, 3, 4]
+    assert [item.result for item in results] == ['/file/1.jpg', '/file/2.jpg', None, None, '/file/5.jpg']
+    assert isinstance(results[3].error, exceptions.NoFilesPassed)
+
+
+@pytest.mark.asyncio
+async def test_sniff_content_type():
+    with open(IMAGE_PATH, 'rb') as file:
+        head = file.read(16)
+
+    assert files.sniff_content_type(head) == 'image/jpeg'
+    assert files.sniff_content_type(b'\x89PNG\r\n\x1a\n\x00\x00') == 'image/png'
+    assert files.sniff_content_type(b'\x00\x00\x00\x18ftypmp42') == 'video/mp4'
+    assert files.sniff_content_type(b'<html>') is None
+
+    class Stream:
+        def __init__(self):
+            self.buffer = io.BytesIO(b'tail')
+
+        async def read(self, size=-1):
+            return self.buffer.read(size)
+
+    chunks = [chunk async for chunk in files.iter_chunks(files.PrefixedReader(head, Stream()), chunk_size=10)]
+    assert chunks == [head[:10], head[10:], b'tail']
+
+
+@pytest.mark.asyncio
+async def test_upload_from_url(telegraph: Telegraph, monkeypatch):
+    image = IMAGE_PATH.read_bytes()
+    uploads = {'in_flight': 0, 'max_in_flight': 0, 'files': []}
+
+    async def handle_source(request):
+        # Streamed without Content-Length, so the size is known only while reading
+        name = request.match_info['name']
+        response = web.StreamResponse()
+        response.content_type = 'application/octet-stream'
+        await response.prepare(request)
+        if name == 'slow.jpg':
+            await asyncio.sleep(1)
+        data = image if name != 'big.jpg' else image[:3] + b'0' * (6 * 1024 * 1024 + 512 * 1024)
+        for offset in range(0, len(data), 64 * 1024):
+            await response.write(data[offset:offset + 64 * 1024])
+            await asyncio.sleep(0)
+        await response.write_eof()
+        return response
+
+    async def handle_upload(request):
+        uploads['in_flight'] += 1
+        uploads['max_in_flight'] = max(uploads['max_in_flight'], uploads['in_flight'])
+        try:
+            reader = await request.multipart()
+            part = await reader.next()
+            data = await part.read()
+            await asyncio.sleep(0.05)
+        finally:
+            uploads['in_flight'] -= 1
+        uploads['files'].append((part.filename, part.headers['Content-Type'], data))
+        return web.json_response([{'src': f"/file/{len(uploads['files'])}.jpg"}])
+
+    app = web.Application(client_max_size=10 * 1024 * 1024)
+    app.router.add_get('/source/{name}', handle_source)
+    app.router.add_post('/upload', handle_upload)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(telegraph, 'format_service_url', lambda path: str(server.make_url(path)))
+
+    try:
+        src = await telegraph.upload_from_url(str(server.make_url('/source/image.jpg')), full=False)
+        assert src == '/file/1.jpg'
+        assert uploads['files'][0] == ('file', 'image/jpeg', image)
+
+        with pytest.raises(exceptions.FileTooLarge):
+            await telegraph.upload_from_url(str(server.make_url('/source/big.jpg')), max_size=200000)
+        with pytest.raises(asyncio.TimeoutError):
+            await telegraph.upload_from_url(str(server.make_url('/source/slow.jpg')), source_timeout=0.2)
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            await telegraph.upload_from_url(str(server.make_url('/missing.jpg')))
+        assert error.value.status == 404
+        assert len(uploads['files']) == 1
+
+        urls = [str(server.make_url(f"/source/{index}.jpg")) for index in range(4)]
+        urls.insert(2, str(server.make_url('/source/big.jpg')))
+        results = await telegraph.upload_from_urls(*urls, concurrency=4, max_size=1024 * 1024, full=False)
+
+        assert [item.index for item in results] == [0, 1, 2, 3, 4]
+        assert [item.ok for item in results] == [True, True, False, True, True]
+        assert isinstance(results[2].error, exceptions.FileTooLarge)
+        assert uploads['max_in_flight'] > 1
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_cache(telegraph: Telegraph, monkeypatch, tmp_path):
+    uploaded = []
+
+    async def handle_upload(request):
+        reader = await request.multipart()
+        result = []
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            uploaded.append(part.filename)
+            result.append({'src': f"/file/{len(uploaded)}.jpg"})
+        return web.json_response(result)
+
+    app = web.Application()
+    app.router.add_post('/upload', handle_upload)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(telegraph, 'format_service_url', lambda path: str(server.make_url(path)))
+
+    try:
+        for cache in (MemoryUploadCache(), SQLiteUploadCache(str(tmp_path / 'uploads.sqlite'))):
+            uploaded.clear()
+            telegraph.upload_cache = cache
+
+            first = await telegraph.upload(IMAGE_PATH, ('logo.png', io.BytesIO(b'logo')), full=False)
+            second = await telegraph.upload(('logo.png', io.BytesIO(b'logo')), IMAGE_PATH, full=False)
+            assert second == first[::-1]
+            assert uploaded == ['telegraph.jpg', 'logo.png']
+
+            with open(IMAGE_PATH, 'rb') as file:
+                assert await telegraph.upload(file, stream=True, full=False) == first[:1]
+            assert len(uploaded) == 2
+            await cache.close()
+
+        # Content of non-seekable streams is hashed while uploading
+        class AsyncReader:
+            def __init__(self):
+                self.buffer = io.BytesIO(b'stream')
+
+            async def read(self, size):
+                return self.buffer.read(size)
+
+        telegraph.upload_cache = MemoryUploadCache()
+        src = await telegraph.upload(('stream.jpg', AsyncReader()), stream=True, full=False)
+        assert await telegraph.upload(('stream.jpg', io.BytesIO(b'stream')), full=False) == src
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_upload_cache_off_loop(tmp_path, monkeypatch):
+    threads = set()
+    hash_content = upload_cache.hash_content
+
+    def record(func):
+        def wrapper(*args):
+            threads.add(threading.get_ident())
+            return func(*args)
+        return wrapper
+
+    monkeypatch.setattr(upload_cache, 'hash_content', record(hash_content))
+    with open(IMAGE_PATH, 'rb') as file:
+        assert await upload_cache.hash_content_async(file) == hash_content(IMAGE_PATH.read_bytes())
+        assert file.tell() == 0
+
+    cache = SQLiteUploadCache(str(tmp_path / 'uploads.sqlite'))
+    monkeypatch.setattr(cache, '_get', record(cache._get))
+    monkeypatch.setattr(cache, '_set', record(cache._set))
+    await cache.set('digest', '/file/1.jpg')
+    assert await cache.get('digest') == '/file/1.jpg'
+    assert await cache.get('unknown') is None
+    await cache.close()
+
+    assert threads and threading.get_ident() not in threads
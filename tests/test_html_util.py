@@ -95,6 +95,11 @@ def test_nodes_to_json():
     json = html.nodes_to_json(NODES)
 
     assert json == JSON
+    assert html.nodes_to_json(JSON) == JSON
+
+
+def test_json_to_html():
+    assert html.node_to_html(JSON) == HTML
 
 
 def test_html_to_json():
@@ -103,6 +108,20 @@ def test_html_to_json():
     assert content == JSON
 
 
+def test_html_to_json_same_as_nodes():
+    content = '<p id="first">Text <b>bold <i>italic</i></b><br>&amp; tail</p><figure><img src="/file/1.jpg"/>' \
+              '<figcaption>Caption</figcaption></figure><ul><li>Foo</li><li></li></ul>text&#x3E;<hr/>'
+
+    assert html.html_to_json(content) == html.nodes_to_json(html.html_to_nodes(content))
+    assert html.html_to_json(HTML * 10) == html.nodes_to_json(html.html_to_nodes(HTML * 10))
+
+
+def test_invalid_html_to_json():
+    for content in ('<p><a href="#">test</p></a>', '<p>text', '</p>', '<body></body>'):
+        with pytest.raises(ValueError):
+            html.html_to_json(content)
+
+
 def test_invalid_html():
     with pytest.raises(ValueError):
         html.html_to_nodes('<p><a href="#">test</p></a>')
@@ -111,6 +130,16 @@ def test_invalid_html():
         html.html_to_nodes('<p>text')
 
 
+@pytest.mark.parametrize('backend', ['stdlib', 'lxml'])
+def test_not_opened_tag(backend):
+    if backend == 'lxml':
+        pytest.importorskip('lxml')
+
+    for convert in (html.html_to_nodes, html.html_to_json):
+        with pytest.raises(ValueError, match='"p" tag is not opened'):
+            convert('text</p>', backend=backend)
+
+
 def test_bad_tag():
     with pytest.raises(ValueError):
         html.html_to_nodes('<body></body>')
@@ -128,3 +157,67 @@ def test_entityref():
 
 def test_charref():
     assert html.html_to_nodes('&#x3E;')[0] == '>'
+
+
+@pytest.mark.parametrize('content', [
+    HTML,
+    '<p>\n<b>x</b>\n</p><br/><a href="a&amp;b" target="_blank">x</a>',
+    'plain &amp; text&#x3E; &nbsp;',
+    '<P>x</P><a HREF="x">y</a><a href="a\nb">x</a><br>x</br>',
+    '<!-- comment -->a<!--d-->b<p>a<![CDATA[x]]>b</p>',
+    '<p><a href="#">test</p></a>',
+    '<p>text',
+    '<body></body>',
+    '<p>&#128;</p>',
+    '<p>&#x80;</p>',
+    '<p>&#150; &#x27; &#39;</p>',
+    '<a href="&#150;">&#x7F;&#xFDD0;</a>',
+    '<p>&#0;&#xD800;&#1114112;</p>',
+])
+def test_lxml_backend(content):
+    pytest.importorskip('lxml')
+
+    def parse(backend):
+        try:
+            return html.html_to_json(content, backend=backend)
+        except ValueError as e:
+            return e
+
+    stdlib_result = parse('stdlib')
+    lxml_result = parse('lxml')
+    if isinstance(stdlib_result, ValueError):
+        assert str(lxml_result) == str(stdlib_result)
+    else:
+        assert lxml_result == stdlib_result
+        assert html.html_to_nodes(content, backend='lxml') == html.html_to_nodes(content)
+
+
+def test_parser_backends():
+    assert isinstance(html.get_parser_backend(), html.StdlibParserBackend)
+    assert isinstance(html.get_parser_backend('auto'), html.ParserBackend)
+
+    with pytest.raises(ValueError):
+        html.get_parser_backend('unknown')
+
+
+def test_iter_html():
+    chunks = list(html.iter_html(NODES * 100, chunk_size=1024))
+
+    assert ''.join(chunks) == HTML * 100
+    assert all(len(chunk) >= 1024 for chunk in chunks[:-1])
+    assert ''.join(html.iter_html(NODES, chunk_size=None)) == HTML
+
+    with pytest.raises(TypeError):
+        list(html.iter_html(['test', 42]))
+
+
+def test_deep_nodes_to_html():
+    node = root = NodeElement(tag='blockquote')
+    for _ in range(10000):
+        child = NodeElement(tag='b')
+        node.children.append(child)
+        node = child
+    node.children.append('text')
+
+    content = html.node_to_html(root)
+    assert content == '<blockquote>' + '<b>' * 10000 + 'text' + '</b>' * 10000 + '</blockquote>'
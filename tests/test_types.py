@@ -3,6 +3,9 @@ Partial test of types.
 Only features and untested functions will be tested here.
 """
 
+import pickle
+
+import attr
 import pytest
 
 from aiograph import types
@@ -73,3 +76,72 @@ def test_path_parser():
     page = types.Page(path=None, content=None)
     assert page.parsed_path is None
     assert page.content is None
+
+
+def test_slotted_types():
+    node = types.NodeElement(tag='p', children=['text'])
+    page = types.Page(path='Test-path', content=[{'tag': 'p', 'children': ['text']}])
+
+    for obj in (node, page):
+        assert not hasattr(obj, '__dict__')
+        with pytest.raises(AttributeError):
+            obj.unknown = 'value'
+
+    with pytest.raises(ValueError):
+        types.NodeElement(tag='script')
+    with pytest.raises(ValueError):
+        types.Page(content=[{'tag': 'script'}]).content
+
+
+def test_page_iter_html():
+    page = types.Page(path='Test-path', content=[{'tag': 'p', 'children': ['Test']}] * 3)
+
+    assert ''.join(page.iter_html(chunk_size=10)) == page.html_content == '<p>Test</p>' * 3
+
+
+def test_page_lazy_content():
+    raw = [{'tag': 'p', 'children': ['Test']}, 'text']
+    page = types.Page(path='Test-path', content=raw)
+
+    assert page.raw_content is raw
+    assert page.html_content == '<p>Test</p>text'
+    assert page._raw_content is raw
+
+    assert page.content[0].tag == 'p'
+    assert page.content is page.content
+
+    page.content[0].add('Changed')
+    assert page.raw_content == [{'tag': 'p', 'children': ['Test', 'Changed']}, 'text']
+    assert page.html_content == '<p>TestChanged</p>text'
+
+    page.content = [types.NodeElement(tag='b')]
+    assert page.raw_content == [{'tag': 'b'}]
+    assert page.html_content == '<b></b>'
+
+    page = types.Page(content=[types.NodeElement(tag='b'), 'text'])
+    assert page.raw_content == [{'tag': 'b'}, 'text']
+
+
+def test_page_lazy_content_equality():
+    raw = [{'tag': 'p', 'children': ['Test']}, 'text']
+    first = types.Page(path='Test-path', content=raw)
+    second = types.Page(path='Test-path', content=[{'tag': 'p', 'children': ['Test']}, 'text'])
+    assert first == second
+
+    assert first.content[0].tag == 'p'
+    assert first == second
+    assert first.raw_content == raw
+    assert attr.asdict(first) == attr.asdict(second)
+    assert attr.asdict(first)['content'] == [{'tag': 'p', 'attrs': {}, 'children': ['Test']}, 'text']
+    assert '_raw_content' not in attr.asdict(first)
+    assert repr(first).count('content=') == 1
+
+    # Raw content is dropped when nodes are created
+    with pytest.raises(AttributeError):
+        first._raw_content
+    assert first.html_content == '<p>Test</p>text'
+
+    copy = pickle.loads(pickle.dumps(first))
+    assert copy == first
+    assert copy.raw_content == raw
+    assert attr.evolve(second, title='New').content == first.content